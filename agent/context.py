@@ -2,12 +2,15 @@
 
 from __future__ import annotations
 
+import logging
 import os
 from dataclasses import dataclass, field, fields
 from typing import Annotated
 
 from prompts import SYSTEM_PROMPT
 
+logger = logging.getLogger(__name__)
+
 
 @dataclass(kw_only=True)
 class Context:
@@ -53,10 +56,14 @@ class Context:
     )
 
     def __post_init__(self) -> None:
+        # Debug logging is gated so per-instantiation stdio writes (and key
+        # material) never hit the hot path at default log levels.
         if self.api_key:
             os.environ.setdefault("OPENAI_API_KEY", self.api_key)
-            print(f"DEBUG: Set OPENAI_API_KEY: {self.api_key[:10]}...")  # Only print first 10 chars for security
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("OPENAI_API_KEY set (prefix=%s...)", self.api_key[:4])
         if self.base_url:
             os.environ.setdefault("OPENAI_BASE_URL", self.base_url)
-            print(f"DEBUG: Set OPENAI_BASE_URL: {self.base_url}")
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("OPENAI_BASE_URL set to %s", self.base_url)
 
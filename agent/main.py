@@ -1,68 +1,80 @@
-import os
-import re
-from typing import Any, Dict, List
 from dotenv import load_dotenv
 import asyncio
 from datetime import datetime
+from pathlib import Path
 from rich.console import Console
-from rich.progress import track
+from rich.progress import Progress, SpinnerColumn, TextColumn
 
+from configs.env import env
 from context import Context
-from langgraph.runtime import Runtime
-from graph import react_graph
-from langchain_core.messages import HumanMessage
-
-from data.case_repository import CaseRepository
-from data.database import SessionLocal
-from services.case_parser import _persist_cases,parse_agent_output
-
-
 
 
 async def main() -> None:
     # Load environment variables first
     load_dotenv()
 
+    # Heavy imports (langgraph/langchain and the DB layer) are deferred until
+    # the agent actually runs, keeping module import cheap.
+    from graph import react_graph
+    from services.case_parser import _persist_cases, parse_agent_output
+
     # Configure the agent's runtime context
     ctx = Context(
         model="openai/gpt-oss-120b",
-        api_key=os.getenv("OPENROUTER_KEY") or os.getenv("OPENAI_API_KEY"),
-        base_url=os.getenv("BASE_URL") or os.getenv("OPENAI_BASE_URL") or "https://openrouter.ai/api/v1",
+        api_key=env("OPENROUTER_KEY") or env("OPENAI_API_KEY"),
+        base_url=env("BASE_URL") or env("OPENAI_BASE_URL") or "https://openrouter.ai/api/v1",
         max_search_results=10,
     )
 
     console = Console()
     console.print("[bold cyan]Agent is thinking...[/bold cyan]")
 
-    # Using track for a simulated progress bar
-    # In a real scenario, you'd integrate this with actual steps of your agent's work
-    for step in track(range(10), description="Generating scenarios..."):
-        if step == 0:  # Only call the ainvoke once
-            result = await react_graph.ainvoke(
-                {
-                    "messages": [
-                        (
-                            "user",
-                            "Find 10 interesting or best new scenarios for the use and implementation of Generative AI in Russia, China, USA and worldwide in 2025, considering the economic effect when selecting cases. Focus on the following sectors: manufacturing, finance, medicine, education, government, and cybersecurity. Please provide separate lists for Russia, China, USA, and the worldwide group. Focus only on Generative AI and scenarios specifically for 2025.",
-                        )
-                    ]
-                },
-                context=ctx,
+    graph_input = {
+        "messages": [
+            (
+                "user",
+                "Find 10 interesting or best new scenarios for the use and implementation of Generative AI in Russia, China, USA and worldwide in 2025, considering the economic effect when selecting cases. Focus on the following sectors: manufacturing, finance, medicine, education, government, and cybersecurity. Please provide separate lists for Russia, China, USA, and the worldwide group. Focus only on Generative AI and scenarios specifically for 2025.",
             )
-        await asyncio.sleep(0.5)  # Simulate work between "steps"
+        ]
+    }
+
+    # The progress display follows real graph events instead of a fake loop:
+    # each model/tool start updates the description, and the final state is
+    # taken from the top-level chain-end event.
+    result = None
+    with Progress(
+        SpinnerColumn(),
+        TextColumn("[progress.description]{task.description}"),
+        console=console,
+        transient=True,
+    ) as progress:
+        task = progress.add_task("Generating scenarios...", total=None)
+        async for event in react_graph.astream_events(graph_input, context=ctx, version="v2"):
+            kind = event["event"]
+            if kind == "on_chat_model_start":
+                progress.update(task, description="Calling the model...")
+            elif kind == "on_tool_start":
+                progress.update(task, description=f"Running tool: {event.get('name', 'tool')}...")
+            elif kind == "on_chain_end" and event.get("name") == "ReAct Agent":
+                result = event["data"]["output"]
+
+    if result is None:
+        raise RuntimeError("Agent graph finished without producing a final state.")
 
     console.print(":sparkles: Done!", style="green")
 
     agent_output = result["messages"][-1].content
     print("Agent output:\n", agent_output)
 
-    # Save the output to a file
-    with open("agent_output.txt", "w") as f:
-        f.write("\n\n--------------------\n")
-        f.write(f"Generated on: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
-        f.write("--------------------\n\n")
-        f.write(agent_output)
-        f.write("--------------------\n\n")
+    # Save the output to a file in one write instead of five f.write calls
+    Path("agent_output.txt").write_text(
+        "\n\n--------------------\n"
+        f"Generated on: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n"
+        "--------------------\n\n"
+        f"{agent_output}"
+        "--------------------\n\n",
+        encoding="utf-8"
+    )
     print("\nAgent output saved to agent_output.txt")
 
     _persist_cases(agent_output)
@@ -70,7 +82,6 @@ async def main() -> None:
     console.print(f"[bold green]Parsed {len(payloads)} cases[/bold green]")
     for case in payloads[:3]:
         console.print(f"- {case['case']['title']}")
-    _persist_cases(agent_output)
 
 
 if __name__ == "__main__":
@@ -1,36 +1,15 @@
-import os
 import sys
 import logging
+from concurrent.futures import ThreadPoolExecutor
+
 import click
-import yaml
-from typing import Dict, Any
 
 from src.utils.logger_config import setup_logging
 setup_logging()
 logger = logging.getLogger(__name__)
 
-from src.data_ingestion.postgres_loader import PostgresLoader
-from src.data_ingestion.cleaners.case_cleaner import CaseCleaner
-from src.embeddings.models.embedding_model import create_embedding_model
-from src.embeddings.chunkers.text_splitter import TextSplitter
-from src.embeddings.pipelines.embedding_pipeline import EmbeddingPipeline
-from src.vector_store.qdrant_client import QdrantClient
-
-
-def load_config(config_path: str) -> Dict[str, Any]:
-    """Загружает конфигурацию из YAML файла."""
-    try:
-        with open(config_path, 'r', encoding='utf-8') as f:
-            return yaml.safe_load(f)
-    except FileNotFoundError:
-        logger.exception(f"Configuration file not found: {config_path}")
-        raise
-    except yaml.YAMLError:
-        logger.exception(f"Error parsing YAML configuration from {config_path}")
-        raise
-    except Exception:
-        logger.exception(f"An unexpected error occurred while loading config from {config_path}")
-        raise
+from src.configs.env import env
+from src.configs.utils import load_embedding_config, load_qdrant_config
 
 @click.command(name="ingest")
 @click.option('--qdrant-config-path', default='src/configs/qdrant.yaml',
@@ -42,25 +21,27 @@ def load_config(config_path: str) -> Dict[str, Any]:
 @click.option('--logging-config-path', default='src/configs/logging.yaml',
               help='Path to the logging configuration file.',
               type=click.Path(exists=True))
-def ingest(qdrant_config_path: str, embeddings_config_path: str, logging_config_path: str):
+@click.option('--recreate', is_flag=True, default=False,
+              help='Drop and re-create the Qdrant collection before ingesting.')
+def ingest(qdrant_config_path: str, embeddings_config_path: str, logging_config_path: str, recreate: bool):
     """
     Runs the full data ingestion and embedding pipeline.
     """
     logger.info("CLI command 'ingest' started.")
 
-    qdrant_config: Dict[str, Any] = {}
-    embeddings_config: Dict[str, Any] = {}
+    # Тяжёлые зависимости (torch/transformers/qdrant_client) импортируются
+    # только при реальном запуске команды, а не на каждый `--help`.
+    from src.data_ingestion.postgres_loader import PostgresLoader
+    from src.data_ingestion.cleaners.case_cleaner import CaseCleaner
+    from src.embeddings.models.embedding_model import create_embedding_model
+    from src.embeddings.chunkers.text_splitter import TextSplitter
+    from src.embeddings.pipelines.embedding_pipeline import EmbeddingPipeline
+    from src.vector_store.qdrant_client import QdrantClient
 
     try:
-        full_qdrant_config = load_config(qdrant_config_path)
-        qdrant_config = full_qdrant_config.get('qdrant', {}) # Extract 'qdrant' section
-        if not qdrant_config:
-            raise ValueError("Qdrant configuration section 'qdrant' not found in config file.")
-
-        full_embeddings_config = load_config(embeddings_config_path)
-        embeddings_config = full_embeddings_config.get('embedding_model', {}) # Extract 'embedding_model' section
-        if not embeddings_config:
-            raise ValueError("Embedding model configuration section 'embedding_model' not found in config file.")
+        # Секции валидируются Pydantic'ом один раз; дальше только доступ к атрибутам.
+        qdrant_config = load_qdrant_config(qdrant_config_path)
+        embeddings_config = load_embedding_config(embeddings_config_path)
 
         logger.info("All configurations loaded successfully.")
     except Exception as e:
@@ -70,34 +51,42 @@ def ingest(qdrant_config_path: str, embeddings_config_path: str, logging_config_
 
     embedding_model = None
     vector_size: int | None = None
-    logger.info("Initializing embedding model...")
+    qdrant_client: QdrantClient | None = None
+    qdrant_collection_name: str = qdrant_config.collection_name
+    logger.info("Initializing embedding model and Qdrant client in parallel...")
     try:
-        embedding_model = create_embedding_model(config=embeddings_config)
-        
-        # Modified: Access vector_size property directly
-        vector_size = embedding_model.vector_size 
-        
-        model_name = embeddings_config.get("model_name", "default-embedding-model")
+        # Загрузка весов модели и установка соединения с Qdrant независимы друг
+        # от друга — инициализируем их параллельно, wall-time = max, а не сумма.
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            model_future = executor.submit(
+                create_embedding_model,
+                config=embeddings_config.model_dump(exclude_none=True),
+            )
+            qdrant_future = executor.submit(
+                QdrantClient,
+                host=qdrant_config.host,
+                port=qdrant_config.port,
+                grpc_port=qdrant_config.grpc_port,
+                api_key=env(qdrant_config.api_key_env),
+            )
+            embedding_model = model_future.result()
+            qdrant_client = qdrant_future.result()
+
+        vector_size = embedding_model.vector_size
+        model_name = embeddings_config.model_name or "default-embedding-model"
         logger.info(f"Embedding model '{model_name}' initialized successfully with vector size: {vector_size}")
     except Exception as e:
-        logger.error(f"Failed to initialize embedding model. Error: {e}", exc_info=True)
-        click.echo("Error: Failed to initialize embedding model. Check logs for details.", err=True)
+        logger.error(f"Failed to initialize embedding model or Qdrant client. Error: {e}", exc_info=True)
+        click.echo("Error: Failed to initialize embedding model or Qdrant client. Check logs for details.", err=True)
         sys.exit(1)
 
-    qdrant_client: QdrantClient | None = None
-    qdrant_collection_name: str = qdrant_config["collection_name"] # Modified: Access directly after extracting 'qdrant' section
     try:
-        logger.info("Initializing Qdrant client...")
-        qdrant_client = QdrantClient(
-            host=qdrant_config["host"],
-            port=qdrant_config.get("port"),
-            grpc_port=qdrant_config.get("grpc_port"),
-            api_key=os.getenv(qdrant_config.get("api_key_env", "QDRANT_API_KEY")), # Pass env var name to os.getenv
-            vector_size=vector_size
-        )
         logger.info(f"Ensuring Qdrant collection '{qdrant_collection_name}' exists or is created with vector size {vector_size}...")
-        # Modified: Pass vector_size to recreate_collection, and removed collection_name if it's already in the client
-        qdrant_client.recreate_collection(vector_size=vector_size) 
+        # Обычный ингест только досоздает коллекцию; полная пересборка — явно через --recreate.
+        if recreate:
+            qdrant_client.recreate_collection(vector_size=vector_size)
+        else:
+            qdrant_client.ensure_collection(vector_size=vector_size)
         logger.info(f"Qdrant client initialized and collection '{qdrant_collection_name}' ensured.")
     except Exception:
         logger.exception("Failed to initialize Qdrant client or ensure collection.")
@@ -112,8 +101,8 @@ def ingest(qdrant_config_path: str, embeddings_config_path: str, logging_config_
         postgres_loader = PostgresLoader() 
         case_cleaner = CaseCleaner()
         text_splitter = TextSplitter(
-            chunk_size=embeddings_config.get("chunk_size", 500),
-            chunk_overlap=embeddings_config.get("chunk_overlap", 100)
+            chunk_size=embeddings_config.chunk_size,
+            chunk_overlap=embeddings_config.chunk_overlap
         )
         logger.info("Data loading and processing components initialized.")
     except Exception:
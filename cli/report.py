@@ -1,26 +1,14 @@
-import os
 import logging
+from concurrent.futures import ThreadPoolExecutor
+
 import click
-import yaml
-from typing import Dict, Any
 
 from src.utils.logger_config import setup_logging
 setup_logging()
 logger = logging.getLogger(__name__)
 
-def load_config(config_path: str) -> Dict[str, Any]:
-    try:
-        with open(config_path, 'r', encoding='utf-8') as f:
-            return yaml.safe_load(f)
-    except Exception as e:
-        logger.exception(f"Failed to load config {config_path}")
-        raise
-
-from src.vector_store.qdrant_client import QdrantClient
-from src.embeddings.models.embedding_model import create_embedding_model
-from src.rag.retriever import Retriever
-from src.rag.formatter import Formatter
-from src.rag.generator import Generator
+from src.configs.env import env
+from src.configs.utils import load_embedding_config, load_qdrant_config
 
 @click.command(name="report")
 @click.option('--qdrant-config-path', default='src/configs/qdrant.yaml', help='Путь к конфигу Qdrant.')
@@ -37,20 +25,36 @@ def report(qdrant_config_path, embeddings_config_path, llm_model, api_key, base_
     """Генерирует аналитический отчёт на основе RAG."""
     logger.info("Report generation started.")
 
+    # Ленивая загрузка тяжёлых зависимостей: `--help` не тянет torch/qdrant_client.
+    from src.vector_store.qdrant_client import QdrantClient
+    from src.embeddings.models.embedding_model import create_embedding_model
+    from src.rag.retriever import Retriever
+    from src.rag.formatter import Formatter
+    from src.rag.generator import Generator
+
     try:
-        qdrant_config = load_config(qdrant_config_path).get('qdrant', {})
-        embeddings_config = load_config(embeddings_config_path).get('embedding_model', {})
+        qdrant_config = load_qdrant_config(qdrant_config_path)
+        embeddings_config = load_embedding_config(embeddings_config_path)
 
-        embedding_model = create_embedding_model(config=embeddings_config)
-        qdrant_client = QdrantClient(
-            host=qdrant_config["host"],
-            port=qdrant_config.get("port"),
-            grpc_port=qdrant_config.get("grpc_port"),
-            api_key=os.getenv(qdrant_config.get("api_key_env", "QDRANT_API_KEY")),
-            vector_size=embedding_model.vector_size
-        )
+        # Модель и клиент Qdrant инициализируются параллельно (как в ingest.py);
+        # размер вектора проставляется клиенту, когда модель загружена.
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            model_future = executor.submit(
+                create_embedding_model,
+                config=embeddings_config.model_dump(exclude_none=True),
+            )
+            qdrant_future = executor.submit(
+                QdrantClient,
+                host=qdrant_config.host,
+                port=qdrant_config.port,
+                grpc_port=qdrant_config.grpc_port,
+                api_key=env(qdrant_config.api_key_env),
+            )
+            embedding_model = model_future.result()
+            qdrant_client = qdrant_future.result()
+        qdrant_client.vector_size = embedding_model.vector_size
 
-        retriever = Retriever(qdrant_client, embedding_model, qdrant_config["collection_name"])
+        retriever = Retriever(qdrant_client, embedding_model, qdrant_config.collection_name)
         formatter = Formatter(max_chunks=top_k)
         generator = Generator(fully_specified_name=llm_model, api_key=api_key, base_url=base_url)
 
@@ -1,31 +1,13 @@
-import os
 import logging
+from concurrent.futures import ThreadPoolExecutor
+
 import click
-import yaml
-from typing import Dict, Any
 from src.utils.logger_config import setup_logging
 setup_logging()
 logger = logging.getLogger(__name__)
 
-# Inline load_config function to avoid ModuleNotFoundError for missing src.configs.load_config
-def load_config(config_path: str) -> Dict[str, Any]:
-    """Загружает конфигурацию из YAML файла."""
-    try:
-        with open(config_path, 'r', encoding='utf-8') as f:
-            return yaml.safe_load(f)
-    except FileNotFoundError:
-        logger.exception(f"Configuration file not found: {config_path}")
-        raise
-    except yaml.YAMLError:
-        logger.exception(f"Error parsing YAML configuration from {config_path}")
-        raise
-    except Exception:
-        logger.exception(f"An unexpected error occurred while loading config from {config_path}")
-        raise
-
-from src.vector_store.qdrant_client import QdrantClient
-from src.embeddings.models.embedding_model import create_embedding_model
-from src.rag.retriever import Retriever
+from src.configs.env import env
+from src.configs.utils import load_embedding_config, load_qdrant_config
 
 @click.command(name="search")
 @click.option('--qdrant-config-path', default='src/configs/qdrant.yaml', help='Путь к конфигу Qdrant.')
@@ -39,21 +21,34 @@ def search(qdrant_config_path, embeddings_config_path, query, top_k, region_id,
     """CLI для семантического поиска в Qdrant."""
     logger.info("CLI command 'search' started.")
 
+    # Ленивая загрузка тяжёлых зависимостей: `--help` не тянет torch/qdrant_client.
+    from src.vector_store.qdrant_client import QdrantClient
+    from src.embeddings.models.embedding_model import create_embedding_model
+    from src.rag.retriever import Retriever
+
     try:
-        qdrant_config = load_config(qdrant_config_path).get('qdrant', {})
-        embeddings_config = load_config(embeddings_config_path).get('embedding_model', {})
+        qdrant_config = load_qdrant_config(qdrant_config_path)
+        embeddings_config = load_embedding_config(embeddings_config_path)
 
-        # Инициализируем модель и клиента (как в ingest.py)
-        embedding_model = create_embedding_model(config=embeddings_config)
-        qdrant_client = QdrantClient(
-            host=qdrant_config["host"],
-            port=qdrant_config.get("port"),
-            grpc_port=qdrant_config.get("grpc_port"),
-            api_key=os.getenv(qdrant_config.get("api_key_env", "QDRANT_API_KEY")),
-            vector_size=embedding_model.vector_size
-        )
+        # Модель и клиент Qdrant инициализируются параллельно (как в ingest.py);
+        # размер вектора проставляется клиенту, когда модель загружена.
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            model_future = executor.submit(
+                create_embedding_model,
+                config=embeddings_config.model_dump(exclude_none=True),
+            )
+            qdrant_future = executor.submit(
+                QdrantClient,
+                host=qdrant_config.host,
+                port=qdrant_config.port,
+                grpc_port=qdrant_config.grpc_port,
+                api_key=env(qdrant_config.api_key_env),
+            )
+            embedding_model = model_future.result()
+            qdrant_client = qdrant_future.result()
+        qdrant_client.vector_size = embedding_model.vector_size
 
-        retriever = Retriever(qdrant_client, embedding_model, qdrant_config["collection_name"])
+        retriever = Retriever(qdrant_client, embedding_model, qdrant_config.collection_name)
 
         # Собираем фильтры
         filters = {}
@@ -0,0 +1,13 @@
+import os
+from functools import lru_cache
+from typing import Optional
+
+
+@lru_cache(maxsize=None)
+def env(name: str, default: Optional[str] = None) -> Optional[str]:
+    """Читает переменную окружения с кэшированием результата.
+
+    Креденшлы (ключи Qdrant/OpenAI и т.п.) в рамках процесса не меняются,
+    поэтому повторные обращения обслуживаются из кэша без похода в os.environ.
+    """
+    return os.environ.get(name, default)
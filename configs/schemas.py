@@ -0,0 +1,31 @@
+# configs/schemas.py
+from typing import Optional
+
+from pydantic import BaseModel
+
+# -----------------------------------------------------------
+# Типизированные модели секций YAML-конфигов.
+# Валидация выполняется один раз при загрузке; дальше все обращения —
+# это доступ к атрибутам замороженного объекта, а не dict.get() по месту.
+# -----------------------------------------------------------
+
+
+class QdrantConfig(BaseModel, frozen=True):
+    host: str = "localhost"
+    port: Optional[int] = None
+    grpc_port: Optional[int] = None
+    api_key_env: str = "QDRANT_API_KEY"
+    collection_name: str
+
+
+class EmbeddingConfig(BaseModel, frozen=True):
+    type: str
+    model_name: Optional[str] = None
+    chunk_size: int = 500
+    chunk_overlap: int = 100
+    api_key_env: Optional[str] = None
+    base_url: Optional[str] = None
+    precision: str = "fp32"  # fp32 | fp16 | bf16 (для HF-моделей)
+    backend: Optional[str] = None  # None (torch) | "onnx-int8" (для HF-моделей)
+    workers: Optional[int] = None  # >1 — пул процессов для CPU-кодирования HF-моделей
+    cache_path: Optional[str] = None  # путь к SQLite-кэшу эмбеддингов (персистентный между запусками)
@@ -1,9 +1,74 @@
 import yaml
 import os
+import pickle
+from functools import lru_cache
+
+# C-реализация загрузчика (libyaml) в разы быстрее чистопитоновской;
+# при отсутствии собранного libyaml откатываемся на SafeLoader.
+try:
+    from yaml import CSafeLoader as _YamlLoader
+except ImportError:
+    from yaml import SafeLoader as _YamlLoader
+
+
+@lru_cache(maxsize=32)
+def _parse_yaml(abs_path: str, mtime_ns: int) -> dict:
+    # mtime_ns участвует в ключе кэша: при изменении файла кэш инвалидируется сам.
+    # При AI_SCOUT_CONFIG_CACHE=1 рядом с YAML держится pickle-сайдкар: тёплый
+    # запуск CLI читает готовый объект и не запускает YAML-парсер вообще.
+    use_sidecar = os.getenv("AI_SCOUT_CONFIG_CACHE") == "1"
+    sidecar_path = abs_path + ".pkl"
+
+    if use_sidecar:
+        try:
+            if os.path.getmtime(sidecar_path) >= os.path.getmtime(abs_path):
+                with open(sidecar_path, 'rb') as f:
+                    return pickle.load(f)
+        except (OSError, pickle.PickleError):
+            pass  # Сайдкар отсутствует или битый — парсим YAML заново.
+
+    with open(abs_path, 'r', encoding='utf-8') as f:
+        config = yaml.load(f, Loader=_YamlLoader)
+
+    if use_sidecar:
+        try:
+            with open(sidecar_path, 'wb') as f:
+                pickle.dump(config, f, protocol=pickle.HIGHEST_PROTOCOL)
+        except OSError:
+            pass  # Каталог только для чтения — работаем без сайдкара.
+
+    return config
+
 
 def load_config(config_path: str) -> dict:
-    """Loads a YAML configuration file."""
+    """Loads a YAML configuration file.
+
+    Результат кэшируется по абсолютному пути и mtime файла, поэтому повторные
+    вызовы в рамках одного процесса не перечитывают и не перепарсивают YAML.
+    """
     if not os.path.exists(config_path):
         raise FileNotFoundError(f"Config file not found: {config_path}")
-    with open(config_path, 'r', encoding='utf-8') as f:
-        return yaml.safe_load(f)
+    abs_path = os.path.abspath(config_path)
+    return _parse_yaml(abs_path, os.stat(abs_path).st_mtime_ns)
+
+
+@lru_cache(maxsize=8)
+def load_qdrant_config(config_path: str):
+    """Возвращает валидированную секцию 'qdrant' как типизированный объект."""
+    from src.configs.schemas import QdrantConfig
+
+    section = load_config(config_path).get('qdrant')
+    if not section:
+        raise ValueError("Qdrant configuration section 'qdrant' not found in config file.")
+    return QdrantConfig.model_validate(section)
+
+
+@lru_cache(maxsize=8)
+def load_embedding_config(config_path: str):
+    """Возвращает валидированную секцию 'embedding_model' как типизированный объект."""
+    from src.configs.schemas import EmbeddingConfig
+
+    section = load_config(config_path).get('embedding_model')
+    if not section:
+        raise ValueError("Embedding model configuration section 'embedding_model' not found in config file.")
+    return EmbeddingConfig.model_validate(section)
@@ -1,17 +1,20 @@
 from datetime import datetime
+from decimal import Decimal
 from typing import List, Optional
 
 from sqlalchemy import (
     Column,
-    Integer,
-    String,
-    Text,
-    Numeric,
     DateTime,
     ForeignKey,
+    Index,
+    Integer,
+    Numeric,
+    String,
     Table,
+    Text,
+    func,
 )
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from src.data.database import Base # Импортируем 'Base' из database.py
 
@@ -26,107 +29,134 @@ case_technology_drivers_association = Table(
 
 class Region(Base):
     __tablename__ = 'regions'
-    region_id = Column(Integer, primary_key=True)
-    name = Column(String, unique=True, nullable=False)
-    description = Column(Text)
+    region_id: Mapped[int] = mapped_column(primary_key=True)
+    name: Mapped[str] = mapped_column(String, unique=True)
+    description: Mapped[Optional[str]] = mapped_column(Text)
+
+    # Уникальный функциональный индекс по lower(name): регистронезависимый
+    # поиск в get_or_create_* идёт по btree, а 'Россия'/'россия' не плодят дублей.
+    __table_args__ = (
+        Index('ix_regions_name_lower', func.lower(name), unique=True),
+    )
 
-    cases = relationship("Case", back_populates="region")
+    cases: Mapped[List["Case"]] = relationship(back_populates="region")
 
 
 class Sector(Base):
     __tablename__ = 'sectors'
-    sector_id = Column(Integer, primary_key=True)
-    name = Column(String, unique=True, nullable=False)
-    description = Column(Text)
+    sector_id: Mapped[int] = mapped_column(primary_key=True)
+    name: Mapped[str] = mapped_column(String, unique=True)
+    description: Mapped[Optional[str]] = mapped_column(Text)
+
+    # Уникальный функциональный индекс по lower(name): регистронезависимый
+    # поиск в get_or_create_* идёт по btree, а 'Россия'/'россия' не плодят дублей.
+    __table_args__ = (
+        Index('ix_sectors_name_lower', func.lower(name), unique=True),
+    )
 
-    cases = relationship("Case", back_populates="sector")
+    cases: Mapped[List["Case"]] = relationship(back_populates="sector")
 
 
 class TechnologyDriver(Base):
     __tablename__ = 'technology_drivers'
-    driver_id = Column(Integer, primary_key=True)
-    name = Column(String, unique=True, nullable=False)
-    description = Column(Text)
+    driver_id: Mapped[int] = mapped_column(primary_key=True)
+    name: Mapped[str] = mapped_column(String, unique=True)
+    description: Mapped[Optional[str]] = mapped_column(Text)
+
+    # Уникальный функциональный индекс по lower(name): регистронезависимый
+    # поиск в get_or_create_* идёт по btree, а 'Россия'/'россия' не плодят дублей.
+    __table_args__ = (
+        Index('ix_technology_drivers_name_lower', func.lower(name), unique=True),
+    )
 
-    cases = relationship(
-        "Case", secondary=case_technology_drivers_association, back_populates="technology_drivers"
+    cases: Mapped[List["Case"]] = relationship(
+        secondary=case_technology_drivers_association, back_populates="technology_drivers"
     )
 
 
 class PilotMaturityLevel(Base):
     __tablename__ = 'pilot_maturity_levels'
-    level_id = Column(Integer, primary_key=True)
-    code = Column(String, unique=True, nullable=False)
-    description = Column(Text)
+    level_id: Mapped[int] = mapped_column(primary_key=True)
+    code: Mapped[str] = mapped_column(String, unique=True)
+    description: Mapped[Optional[str]] = mapped_column(Text)
 
-    cases = relationship("Case", back_populates="maturity_level_obj")
+    cases: Mapped[List["Case"]] = relationship(back_populates="maturity_level_obj")
 
 
 class ImplementationStatus(Base):
     __tablename__ = 'implementation_statuses'
-    status_id = Column(Integer, primary_key=True)
-    code = Column(String, unique=True, nullable=False)
-    description = Column(Text)
+    status_id: Mapped[int] = mapped_column(primary_key=True)
+    code: Mapped[str] = mapped_column(String, unique=True)
+    description: Mapped[Optional[str]] = mapped_column(Text)
 
-    cases = relationship("Case", back_populates="implementation_status_obj")
+    cases: Mapped[List["Case"]] = relationship(back_populates="implementation_status_obj")
 
 
 class Company(Base):
     __tablename__ = 'companies'
-    company_id = Column(Integer, primary_key=True)
-    name = Column(String, unique=True, nullable=False)
-    description = Column(Text)
-    headquarters = Column(String)
+    company_id: Mapped[int] = mapped_column(primary_key=True)
+    name: Mapped[str] = mapped_column(String, unique=True)
+    description: Mapped[Optional[str]] = mapped_column(Text)
+    headquarters: Mapped[Optional[str]] = mapped_column(String)
 
-    cases = relationship("Case", back_populates="company")
+    cases: Mapped[List["Case"]] = relationship(back_populates="company")
 
 
 class Source(Base):
     __tablename__ = 'sources'
-    source_id = Column(Integer, primary_key=True)
-    title = Column(String, nullable=False)
-    url = Column(Text)
-    publisher = Column(String)
-    published_at = Column(DateTime)
+    source_id: Mapped[int] = mapped_column(primary_key=True)
+    title: Mapped[str] = mapped_column(String)
+    url: Mapped[Optional[str]] = mapped_column(Text)
+    publisher: Mapped[Optional[str]] = mapped_column(String)
+    published_at: Mapped[Optional[datetime]] = mapped_column(DateTime)
 
-    cases = relationship("Case", back_populates="source")
+    cases: Mapped[List["Case"]] = relationship(back_populates="source")
 
 
 class Case(Base):
     __tablename__ = 'cases'
-    case_id = Column(Integer, primary_key=True)
-    region_id = Column(Integer, ForeignKey('regions.region_id'), nullable=False)
-    sector_id = Column(Integer, ForeignKey('sectors.sector_id'), nullable=False)
-    company_id = Column(Integer, ForeignKey('companies.company_id'))
-    implementation_status_id = Column(Integer, ForeignKey('implementation_statuses.status_id'))
-    title = Column(String, nullable=False)
-    summary = Column(Text, nullable=False)
-    detailed_notes = Column(Text)
-    key_effect_note = Column(Text)
-    maturity_level = Column(Integer, ForeignKey('pilot_maturity_levels.level_id'))
-    created_at = Column(DateTime, default=datetime.utcnow)
-    source_id = Column(Integer, ForeignKey('sources.source_id'))
+    case_id: Mapped[int] = mapped_column(primary_key=True)
+    region_id: Mapped[int] = mapped_column(ForeignKey('regions.region_id'))
+    sector_id: Mapped[int] = mapped_column(ForeignKey('sectors.sector_id'))
+    company_id: Mapped[Optional[int]] = mapped_column(ForeignKey('companies.company_id'))
+    implementation_status_id: Mapped[Optional[int]] = mapped_column(ForeignKey('implementation_statuses.status_id'))
+    title: Mapped[str] = mapped_column(String)
+    summary: Mapped[str] = mapped_column(Text)
+    detailed_notes: Mapped[Optional[str]] = mapped_column(Text)
+    key_effect_note: Mapped[Optional[str]] = mapped_column(Text)
+    maturity_level: Mapped[Optional[int]] = mapped_column(ForeignKey('pilot_maturity_levels.level_id'))
+    # Серверный DEFAULT now(): метку времени ставит Postgres, без вызова
+    # Python-колбэка на каждый INSERT и без рассинхрона часов клиентов.
+    created_at: Mapped[Optional[datetime]] = mapped_column(DateTime, server_default=func.now())
+    source_id: Mapped[Optional[int]] = mapped_column(ForeignKey('sources.source_id'))
 
     # Relationships
-    region = relationship("Region", back_populates="cases")
-    sector = relationship("Sector", back_populates="cases")
-    company = relationship("Company", back_populates="cases")
-    implementation_status_obj = relationship("ImplementationStatus", back_populates="cases")
-    maturity_level_obj = relationship("PilotMaturityLevel", back_populates="cases")
-    source = relationship("Source", back_populates="cases")
-    technology_drivers = relationship(
-        "TechnologyDriver", secondary=case_technology_drivers_association, back_populates="cases"
+    region: Mapped["Region"] = relationship(back_populates="cases")
+    sector: Mapped["Sector"] = relationship(back_populates="cases")
+    company: Mapped[Optional["Company"]] = relationship(back_populates="cases")
+    implementation_status_obj: Mapped[Optional["ImplementationStatus"]] = relationship(back_populates="cases")
+    maturity_level_obj: Mapped[Optional["PilotMaturityLevel"]] = relationship(back_populates="cases")
+    source: Mapped[Optional["Source"]] = relationship(back_populates="cases")
+    technology_drivers: Mapped[List["TechnologyDriver"]] = relationship(
+        secondary=case_technology_drivers_association, back_populates="cases"
+    )
+    economic_effects: Mapped[List["EconomicEffect"]] = relationship(
+        back_populates="case", cascade="all, delete-orphan"
     )
-    economic_effects = relationship("EconomicEffect", back_populates="case", cascade="all, delete-orphan")
 
 
 class EconomicEffect(Base):
     __tablename__ = 'economic_effects'
-    effect_id = Column(Integer, primary_key=True)
-    case_id = Column(Integer, ForeignKey('cases.case_id'), nullable=False)
-    effect_type = Column(String, nullable=False)
-    value_numeric = Column(Numeric(18, 4))
-    currency = Column(String)
-    period_note = Column(String)
-
-    case = relationship("Case", back_populates="economic_effects")
\ No newline at end of file
+    effect_id: Mapped[int] = mapped_column(primary_key=True)
+    case_id: Mapped[int] = mapped_column(ForeignKey('cases.case_id'))
+    effect_type: Mapped[str] = mapped_column(String)
+    value_numeric: Mapped[Optional[Decimal]] = mapped_column(Numeric(18, 4))
+    currency: Mapped[Optional[str]] = mapped_column(String)
+    period_note: Mapped[Optional[str]] = mapped_column(String)
+
+    case: Mapped["Case"] = relationship(back_populates="economic_effects")
+
+# Переиспользуемые insert-конструкции для горячего пути ингеста. Один и тот же
+# объект statement стабильно попадает в кэш скомпилированных запросов движка,
+# поэтому executemany в CaseRepository не платит за компиляцию на каждый вызов.
+INSERT_EFFECTS = EconomicEffect.__table__.insert()
@@ -2,7 +2,21 @@
 import re
 from typing import List, Dict, Any, Optional
 
+try:
+    import pandas as pd
+except ImportError:
+    pd = None
+
 class CaseCleaner:
+    # Скомпилированы один раз на класс: без lookup в кэше re на каждое поле.
+    # [^>]* вместо .*? — нет состояний бэктрекинга на длинных текстах.
+    _HTML_RE = re.compile(r'<[^>]*>')
+    _WS_RE = re.compile(r'\s+')
+    # Байтовые версии для ASCII-текстов: регулярка по bytes не итерирует
+    # код-пойнты и сравнивает на уровне memcmp — заметно быстрее на длинных строках.
+    _HTML_RE_B = re.compile(rb'<[^>]*>')
+    _WS_RE_B = re.compile(rb'\s+')
+
     def __init__(self,
                  required_text_fields: List[str] = None,
                  min_text_length: int = 20,
@@ -20,6 +34,10 @@ class CaseCleaner:
         self.required_text_fields = required_text_fields if required_text_fields is not None else ['title', 'summary']
         self.min_text_length = min_text_length
         self.deduplicate_by_fields = deduplicate_by_fields if deduplicate_by_fields is not None else ['title']
+        # Кортеж полей дедупликации, зафиксированный один раз: в горячем цикле
+        # извлечение значений идет через map(case.get, ...) — C-итерация без
+        # повторного чтения атрибута self на каждый кейс.
+        self._dedup_fields = tuple(self.deduplicate_by_fields)
 
     def _normalize_text(self, text: Optional[str]) -> Optional[str]:
         """
@@ -30,8 +48,15 @@ class CaseCleaner:
         if text is None:
             return None
         text = str(text).strip() # Приводим к строке и удаляем пробелы по краям
-        text = re.sub(r'<.*?>', '', text) # Удаляем HTML-теги
-        text = re.sub(r'\s+', ' ', text) # Сжимаем множественные пробелы в один
+        if text.isascii():
+            # Быстрый путь для чисто ASCII-текстов: работаем по bytes.
+            b = text.encode('ascii')
+            b = self._HTML_RE_B.sub(b'', b) # Удаляем HTML-теги
+            b = self._WS_RE_B.sub(b' ', b) # Сжимаем множественные пробелы в один
+            text = b.decode('ascii').strip()
+            return text if text else None
+        text = self._HTML_RE.sub('', text) # Удаляем HTML-теги
+        text = self._WS_RE.sub(' ', text) # Сжимаем множественные пробелы в один
         text = text.strip()
         return text if text else None
 
@@ -46,11 +71,12 @@ class CaseCleaner:
 
         for field in self.required_text_fields:
             text_value = case.get(field)
-            if not text_value or len(text_value) < 5: # Минимальная длина для каждого обязательного поля
+            text_length = len(text_value) if text_value else 0
+            if text_length < 5: # Минимальная длина для каждого обязательного поля
                 all_required_present = False
                 # print(f"Невалидный кейс (case_id: {case.get('case_id')}): Отсутствует или слишком короткое поле '{field}'")
                 break
-            combined_text_length += len(text_value)
+            combined_text_length += text_length
         
         if not all_required_present:
             return False
@@ -64,33 +90,50 @@ class CaseCleaner:
     def clean_cases(self, cases: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         """
         Очищает список кейсов, применяя нормализацию, валидацию и дедупликацию.
+        При наличии pandas работает векторизованно (один C-проход на колонку
+        вместо Python-цикла по кейсам); иначе откатывается на построчный цикл.
         :param cases: Список словарей с данными кейсов.
         :return: Список очищенных и валидных кейсов.
         """
         print(f"Начато очистка {len(cases)} кейсов...")
+        if pd is not None and cases:
+            cleaned_cases = self._clean_cases_vectorized(cases)
+            print(f"Завершено очистку. Осталось {len(cleaned_cases)} валидных и уникальных кейсов.")
+            return cleaned_cases
+
         cleaned_cases = []
         seen_keys = set()
         
         for original_case in cases:
-            # Создаем копию, чтобы не менять оригинальный объект при итерации
-            case = original_case.copy() 
+            # Дешёвый префильтр по сырым длинам: нормализация только укорачивает
+            # текст, поэтому кейс, не добирающий лимиты до regex-очистки,
+            # не доберёт их и после — выбрасываем без затрат на нормализацию.
+            raw_lengths = [len(original_case.get(f) or '') for f in self.required_text_fields]
+            if any(n < 5 for n in raw_lengths) or sum(raw_lengths) < self.min_text_length:
+                continue
+
+            # 1. Нормализация текстовых полей. Один dict comprehension строит
+            # готовый словарь сразу (не copy() + мутации по ключам): одна
+            # аллокация нужного размера, оригинальный объект не меняется.
+            case = {
+                key: self._normalize_text(value) if isinstance(value, str) else value
+                for key, value in original_case.items()
+            }
 
-            # 1. Нормализация текстовых полей
-            for key, value in case.items():
-                if isinstance(value, str):
-                    case[key] = self._normalize_text(value)
-            
             # 2. Валидация
             if not self._validate_case(case):
                 # print(f"Кейс case_id={case.get('case_id')} пропущен из-за невалидности.")
                 continue
 
             # 3. Дедупликация (на основе хеша полей)
-            if self.deduplicate_by_fields:
-                dedup_key_parts = []
-                for field in self.deduplicate_by_fields:
-                    dedup_key_parts.append(str(case.get(field, '')).lower())
-                dedup_key = "|".join(dedup_key_parts)
+            if self._dedup_fields:
+                # Кортеж вместо "|".join(...): без аллокации склеенной строки,
+                # хешируется целиком на C-уровне. Быстрая ветка для строк
+                # (подавляющее большинство значений) минует вызов str().
+                dedup_key = tuple(
+                    v.lower() if isinstance(v, str) else ('' if v is None else str(v).lower())
+                    for v in map(case.get, self._dedup_fields)
+                )
 
                 if dedup_key in seen_keys:
                     # print(f"Кейс case_id={case.get('case_id')} пропущен как дубликат.")
@@ -102,6 +145,48 @@ class CaseCleaner:
         print(f"Завершено очистку. Осталось {len(cleaned_cases)} валидных и уникальных кейсов.")
         return cleaned_cases
 
+    def _clean_cases_vectorized(self, cases: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Векторизованная версия clean_cases на pandas: нормализация, валидация
+        и дедупликация выполняются колонками целиком, без цикла по кейсам.
+        """
+        df = pd.DataFrame(cases)
+
+        # 1. Нормализация текстовых колонок (только там, где реально есть строки)
+        for col in df.columns:
+            if df[col].dtype != object:
+                continue
+            str_mask = df[col].map(lambda v: isinstance(v, str))
+            if not str_mask.any():
+                continue
+            normalized = (
+                df.loc[str_mask, col]
+                .str.replace(self._HTML_RE, '', regex=True)
+                .str.replace(self._WS_RE, ' ', regex=True)
+                .str.strip()
+            )
+            df.loc[str_mask, col] = normalized.where(normalized != '', None)
+
+        # 2. Валидация булевыми масками (те же правила, что в _validate_case)
+        required = [f for f in self.required_text_fields]
+        for field in required:
+            if field not in df.columns:
+                df[field] = None
+        lengths = df[required].fillna('').astype(str).apply(lambda s: s.str.len())
+        valid_mask = (lengths >= 5).all(axis=1) & (lengths.sum(axis=1) >= self.min_text_length)
+        df = df[valid_mask]
+
+        # 3. Дедупликация по lower-ключам, первый дубликат остается
+        if self.deduplicate_by_fields and not df.empty:
+            dedup_cols = [f for f in self.deduplicate_by_fields if f in df.columns]
+            if dedup_cols:
+                keys = df[dedup_cols].fillna('').astype(str).apply(lambda s: s.str.lower())
+                df = df[~keys.duplicated(keep='first')]
+
+        # NaN из объединения ключей словарей приводим обратно к None
+        df = df.astype(object).where(df.notna(), None)
+        return df.to_dict(orient='records')
+
 # Пример использования:
 if __name__ == "__main__":
     test_cases_data = [
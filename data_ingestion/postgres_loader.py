@@ -1,6 +1,7 @@
-from typing import List, Dict, Any
+from typing import Iterator, List, Dict, Any, Optional
 import logging
-from sqlalchemy.orm import sessionmaker, joinedload
+from sqlalchemy import select, func
+from sqlalchemy.orm import sessionmaker, joinedload, selectinload
 from sqlalchemy.exc import SQLAlchemyError
 
 # Импортируем SessionLocal и engine для управления сессиями
@@ -19,9 +20,11 @@ class PostgresLoader:
         """
         logger.info("PostgresLoader initialized.")
 
-    def fetch_cases(self, filters: Dict[str, Any] = None, include_relations: bool = True) -> List[Dict[str, Any]]:
+    def fetch_cases(self, filters: Dict[str, Any] = None, include_relations: bool = True,
+                    min_text_length: Optional[int] = None) -> List[Dict[str, Any]]:
         """
         Извлекает кейсы из базы данных с возможностью фильтрации и включения связанных данных.
+        Обертка совместимости над iter_cases: материализует весь поток в список.
         :param filters: Словарь с фильтрами, где ключ - название колонки, значение - требуемое значение.
                         (например, {'sector_id': 1}). Поддерживаются только прямые фильтры по полям Case.
         :param include_relations: Если True, загружает связанные объекты (region, sector, company и т.д.).
@@ -29,16 +32,39 @@ class PostgresLoader:
         :return: Список словарей с данными кейсов, где связанные объекты также конвертированы в словари.
                  Если include_relations=False, возвращает только поля Case.
         """
+        return list(self.iter_cases(filters=filters, include_relations=include_relations,
+                                    min_text_length=min_text_length))
+
+    def iter_cases(self, filters: Dict[str, Any] = None, include_relations: bool = True,
+                   min_text_length: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Потоково извлекает кейсы из базы данных: генератор отдает словари по мере
+        чтения строк с сервера, не материализуя весь результат в памяти.
+        Память ограничена одним серверным батчем (yield_per), а потребитель
+        (например, эмбеддинг-пайплайн) начинает работу до конца выборки.
+        Параметры те же, что у fetch_cases.
+        """
         if filters is None:
             filters = {}
 
-        db = SessionLocal()
         logger.info(f"Attempting to fetch cases with filters: {filters}, include_relations: {include_relations}")
 
+        # Без связей ORM не нужен вовсе: Core-запрос возвращает готовые
+        # RowMapping без прохода через дескрипторы InstrumentedAttribute
+        # на каждый из 12 атрибутов — словарь собирается на C-уровне.
+        if not include_relations:
+            yield from self._iter_core_rows(filters, min_text_length)
+            return
+
+        db = SessionLocal()
+
         try:
             query = db.query(Case)
 
-            # Если нужно включить связанные данные, используем .options(joinedload(...))
+            # Если нужно включить связанные данные, используем .options(...)
+            # Скалярные связи — joinedload (один LEFT JOIN без умножения строк);
+            # коллекции — selectinload: отдельный IN-запрос вместо декартова
+            # произведения technology_drivers × economic_effects на каждый кейс.
             if include_relations:
                 query = query.options(
                     joinedload(Case.region),
@@ -47,8 +73,8 @@ class PostgresLoader:
                     joinedload(Case.implementation_status_obj),
                     joinedload(Case.maturity_level_obj),
                     joinedload(Case.source),
-                    joinedload(Case.technology_drivers), # для many-to-many
-                    joinedload(Case.economic_effects)
+                    selectinload(Case.technology_drivers), # для many-to-many
+                    selectinload(Case.economic_effects)
                 )
 
             for key, value in filters.items():
@@ -62,67 +88,128 @@ class PostgresLoader:
             query = query.filter(Case.summary.isnot(None))
             logger.debug("Applying filter: Case.summary is not NULL.")
 
-            cases_orm = query.all()
-            logger.info(f"Successfully retrieved {len(cases_orm)} ORM objects from the database.")
-
-            # Преобразование ORM-объектов в словари, с учетом связанных данных
-            result_cases = []
-            for case in cases_orm:
-                case_dict = {
-                    "case_id": case.case_id,
-                    "region_id": case.region_id,
-                    "sector_id": case.sector_id,
-                    "company_id": case.company_id,
-                    "implementation_status_id": case.implementation_status_id,
-                    "title": case.title,
-                    "summary": case.summary,
-                    "detailed_notes": case.detailed_notes,
-                    "key_effect_note": case.key_effect_note,
-                    "maturity_level": case.maturity_level,
-                    "created_at": case.created_at,
-                    "source_id": case.source_id,
-                }
-                
-                # Добавляем данные из связанных таблиц, если они нужны для RAG или индексации
-                if include_relations:
-                    if case.region:
-                        case_dict["region_name"] = case.region.name
-                        case_dict["region_description"] = case.region.description
-                    if case.sector:
-                        case_dict["sector_name"] = case.sector.name
-                        case_dict["sector_description"] = case.sector.description
-                    if case.company:
-                        case_dict["company_name"] = case.company.name
-                    if case.implementation_status_obj:
-                        case_dict["implementation_status_code"] = case.implementation_status_obj.code
-                    if case.maturity_level_obj:
-                        case_dict["maturity_level_code"] = case.maturity_level_obj.code
-                    if case.source:
-                        case_dict["source_title"] = case.source.title
-                    
-                    # Для many-to-many и one-to-many отношений
-                    if case.technology_drivers:
-                        case_dict["technology_drivers_names"] = [td.name for td in case.technology_drivers]
-                    if case.economic_effects:
-                        case_dict["economic_effects_summaries"] = [
-                            f"{ee.effect_type}: {ee.value_numeric} {ee.currency} ({ee.period_note})"
-                            for ee in case.economic_effects
-                        ]
-
-                result_cases.append(case_dict)
-            
-            logger.info(f"Successfully processed {len(result_cases)} cases into dictionary format.")
-            return result_cases
+            # Валидация по длине — на стороне базы: строки, которые CaseCleaner
+            # все равно отбросит, не гоняем по сети и не гидрируем в ORM.
+            if min_text_length:
+                query = query.filter(
+                    Case.title.isnot(None),
+                    func.char_length(Case.title) + func.char_length(Case.summary) >= min_text_length
+                )
+                logger.debug(f"Applying filter: char_length(title) + char_length(summary) >= {min_text_length}.")
+
+            # Детерминированный порядок при серверном стриминге батчами
+            query = query.order_by(Case.case_id)
+
+            # yield_per отдает строки серверными батчами, не буферизуя весь
+            # результат. selectinload по коллекциям совместим со стримингом
+            # (IN-запрос выполняется на каждый батч), поэтому батчим оба режима.
+            query = query.execution_options(stream_results=True).yield_per(1000)
+
+            processed = 0
+            for case in query:
+                yield self._row_to_dict(case, include_relations)
+                processed += 1
+
+            logger.info(f"Successfully processed {processed} cases into dictionary format.")
         except SQLAlchemyError as e:
             logger.error(f"Database error during case fetching: {e}", exc_info=True)
             raise # Перевыбрасываем исключение, чтобы вышестоящий уровень мог его обработать
         except Exception as e:
-            logger.critical(f"An unexpected error occurred in PostgresLoader.fetch_cases: {e}", exc_info=True)
+            logger.critical(f"An unexpected error occurred in PostgresLoader.iter_cases: {e}", exc_info=True)
             raise # Перевыбрасываем общее исключение
         finally:
             db.close() # Закрываем сессию
             logger.debug("Database session closed.")
 
+    def _iter_core_rows(self, filters: Dict[str, Any],
+                        min_text_length: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Быстрый путь для include_relations=False: стримит строки таблицы cases
+        через SQLAlchemy Core, минуя ORM-гидрацию.
+        """
+        table = Case.__table__
+        stmt = select(table)
+
+        for key, value in filters.items():
+            if key in table.c:
+                stmt = stmt.where(table.c[key] == value)
+                logger.debug(f"Applying filter: {key} = {value}")
+            else:
+                logger.warning(f"Column '{key}' not found in Case model for filtering. Skipping filter.")
+
+        # Фильтрация по тому, что summary не NULL
+        stmt = stmt.where(table.c.summary.isnot(None))
+        logger.debug("Applying filter: Case.summary is not NULL.")
+
+        if min_text_length:
+            stmt = stmt.where(
+                table.c.title.isnot(None),
+                func.char_length(table.c.title) + func.char_length(table.c.summary) >= min_text_length
+            )
+            logger.debug(f"Applying filter: char_length(title) + char_length(summary) >= {min_text_length}.")
+
+        stmt = stmt.order_by(table.c.case_id)
+
+        processed = 0
+        try:
+            with engine.connect() as conn:
+                result = conn.execution_options(stream_results=True, yield_per=1000).execute(stmt)
+                for row in result.mappings():
+                    yield dict(row)
+                    processed += 1
+            logger.info(f"Successfully processed {processed} cases into dictionary format.")
+        except SQLAlchemyError as e:
+            logger.error(f"Database error during case fetching: {e}", exc_info=True)
+            raise
+
+    @staticmethod
+    def _row_to_dict(case: Case, include_relations: bool) -> Dict[str, Any]:
+        """
+        Преобразует ORM-объект Case в словарь, с учетом связанных данных.
+        """
+        case_dict = {
+            "case_id": case.case_id,
+            "region_id": case.region_id,
+            "sector_id": case.sector_id,
+            "company_id": case.company_id,
+            "implementation_status_id": case.implementation_status_id,
+            "title": case.title,
+            "summary": case.summary,
+            "detailed_notes": case.detailed_notes,
+            "key_effect_note": case.key_effect_note,
+            "maturity_level": case.maturity_level,
+            "created_at": case.created_at,
+            "source_id": case.source_id,
+        }
+
+        # Добавляем данные из связанных таблиц, если они нужны для RAG или индексации
+        if include_relations:
+            if case.region:
+                case_dict["region_name"] = case.region.name
+                case_dict["region_description"] = case.region.description
+            if case.sector:
+                case_dict["sector_name"] = case.sector.name
+                case_dict["sector_description"] = case.sector.description
+            if case.company:
+                case_dict["company_name"] = case.company.name
+            if case.implementation_status_obj:
+                case_dict["implementation_status_code"] = case.implementation_status_obj.code
+            if case.maturity_level_obj:
+                case_dict["maturity_level_code"] = case.maturity_level_obj.code
+            if case.source:
+                case_dict["source_title"] = case.source.title
+
+            # Для many-to-many и one-to-many отношений
+            if case.technology_drivers:
+                case_dict["technology_drivers_names"] = [td.name for td in case.technology_drivers]
+            if case.economic_effects:
+                case_dict["economic_effects_summaries"] = [
+                    f"{ee.effect_type}: {ee.value_numeric} {ee.currency} ({ee.period_note})"
+                    for ee in case.economic_effects
+                ]
+
+        return case_dict
+
 # Пример использования:
 if __name__ == "__main__":
     import os
@@ -0,0 +1,114 @@
+import hashlib
+import logging
+import os
+import sqlite3
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from src.embeddings.models.embedding_model import EmbeddingModel
+
+logger = logging.getLogger(__name__)
+
+
+class EmbeddingCache:
+    """
+    Persistent embedding cache backed by SQLite. Keys are keyed BLAKE2b
+    digests of the chunk text (the model name is the hash key, so caches of
+    different models never collide); values are raw float32 vector bytes —
+    half the size of pickled Python floats and loadable with zero copies.
+    """
+    def __init__(self, path: str, model_name: str):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        # The 64-byte key cap is a BLAKE2b constraint.
+        self._hash_key = model_name.encode("utf-8")[:64]
+        # check_same_thread=False: the cache may be constructed in a warm-up
+        # worker thread (cli/ingest.py builds the model in a ThreadPoolExecutor)
+        # and then used from the pipeline's main thread. Access is effectively
+        # serialized — the pipeline embeds from a single thread — so sharing
+        # the connection across threads is safe here.
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("CREATE TABLE IF NOT EXISTS emb (key BLOB PRIMARY KEY, vec BLOB NOT NULL)")
+        self._conn.commit()
+        logger.info(f"EmbeddingCache opened at '{path}' for model '{model_name}'.")
+
+    def key_for(self, text: str) -> bytes:
+        return hashlib.blake2b(text.encode("utf-8"), digest_size=16, key=self._hash_key).digest()
+
+    def get_many(self, keys: List[bytes]) -> Dict[bytes, np.ndarray]:
+        """
+        Fetches all cached vectors for the given keys in chunked IN queries.
+        """
+        found: Dict[bytes, np.ndarray] = {}
+        unique = list(dict.fromkeys(keys))
+        # SQLite caps bound parameters per statement; 500 stays well under it.
+        for i in range(0, len(unique), 500):
+            chunk = unique[i:i + 500]
+            placeholders = ",".join("?" * len(chunk))
+            rows = self._conn.execute(
+                f"SELECT key, vec FROM emb WHERE key IN ({placeholders})", chunk
+            ).fetchall()
+            for key, blob in rows:
+                found[key] = np.frombuffer(blob, dtype=np.float32)
+        return found
+
+    def put_many(self, items: Dict[bytes, np.ndarray]) -> None:
+        """
+        Inserts vectors in one executemany + commit.
+        """
+        if not items:
+            return
+        self._conn.executemany(
+            "INSERT OR REPLACE INTO emb (key, vec) VALUES (?, ?)",
+            [(key, np.asarray(vec, dtype=np.float32).tobytes()) for key, vec in items.items()]
+        )
+        self._conn.commit()
+
+    def close(self) -> None:
+        self._conn.close()
+
+
+class CachedEmbeddingModel(EmbeddingModel):
+    """
+    Wraps any EmbeddingModel with an EmbeddingCache: get_embeddings runs the
+    underlying model only on cache misses and fans cached vectors back into
+    place, so re-ingesting a mostly unchanged corpus is embedding-free.
+    """
+    def __init__(self, model: EmbeddingModel, cache_path: str):
+        self.model = model
+        self.model_name = getattr(model, "model_name", model.__class__.__name__)
+        self.cache = EmbeddingCache(cache_path, self.model_name)
+
+    def get_embedding(self, text: str) -> np.ndarray:
+        return self.get_embeddings([text])[0]
+
+    def get_embeddings(self, texts: List[str]) -> np.ndarray:
+        if not texts:
+            return np.empty((0, self.vector_size), dtype=np.float32)
+
+        keys = [self.cache.key_for(text) for text in texts]
+        cached = self.cache.get_many(keys)
+
+        miss_indices = [i for i, key in enumerate(keys) if key not in cached]
+        vectors = np.empty((len(texts), self.vector_size), dtype=np.float32)
+
+        if miss_indices:
+            computed = self.model.get_embeddings([texts[i] for i in miss_indices])
+            computed = np.asarray(computed, dtype=np.float32)
+            new_items: Dict[bytes, np.ndarray] = {}
+            for pos, i in enumerate(miss_indices):
+                vectors[i] = computed[pos]
+                new_items[keys[i]] = computed[pos]
+            self.cache.put_many(new_items)
+
+        for i, key in enumerate(keys):
+            hit = cached.get(key)
+            if hit is not None:
+                vectors[i] = hit
+
+        logger.debug(f"Embedding cache: {len(texts) - len(miss_indices)}/{len(texts)} hits.")
+        return vectors
+
+    @property
+    def vector_size(self) -> int:
+        return self.model.vector_size
@@ -1,4 +1,5 @@
 import logging
+from collections import OrderedDict
 from typing import List, Union, Optional
 
 # Импортируем RecursiveCharacterTextSplitter из langchain
@@ -13,6 +14,60 @@ except ImportError:
 
 logger = logging.getLogger(__name__)
 
+
+class FastCharacterSplitter:
+    """
+    Быстрый жадный сплиттер для набора разделителей по умолчанию
+    ("\\n\\n", "\\n", " "). Вместо рекурсии RecursiveCharacterTextSplitter по
+    уровням разделителей — один линейный проход: окно размера chunk_size,
+    в котором str.rfind (C-код CPython) ищет самый приоритетный разделитель.
+    Семантика та же: чанки не длиннее chunk_size, соседние перекрываются
+    на chunk_overlap, резка предпочитает границы абзацев, потом строк, потом слов.
+    """
+    _SEPARATORS = ("\n\n", "\n", " ")
+
+    def __init__(self, chunk_size: int = 500, chunk_overlap: int = 100):
+        self.chunk_size = chunk_size
+        self.chunk_overlap = chunk_overlap
+
+    def split_text(self, text: str) -> List[str]:
+        n = len(text)
+        if n <= self.chunk_size:
+            stripped = text.strip()
+            return [stripped] if stripped else []
+
+        chunks: List[str] = []
+        start = 0
+        prev_end = 0
+        while start < n:
+            end = min(start + self.chunk_size, n)
+            if end < n:
+                # Ищем ближайшую справа границу в порядке приоритета, чтобы не
+                # резать посреди абзаца или слова. Нижняя граница поиска —
+                # конец предыдущего чанка: иначе после отката на overlap окно
+                # снова упрется в ту же границу и породит вырожденный хвост.
+                for sep in self._SEPARATORS:
+                    cut = text.rfind(sep, max(start, prev_end) + 1, end)
+                    if cut > start:
+                        end = cut + len(sep)
+                        break
+            chunk = text[start:end].strip()
+            if chunk:
+                chunks.append(chunk)
+            if end >= n:
+                break
+            prev_end = end
+            # Перекрытие соседних чанков; start + 1 гарантирует продвижение.
+            start = max(end - self.chunk_overlap, start + 1)
+        return chunks
+
+    def split_texts(self, texts: List[str]) -> List[str]:
+        all_chunks: List[str] = []
+        for text in texts:
+            all_chunks.extend(self.split_text(text))
+        return all_chunks
+
+
 class TextSplitter:
     """
     Класс для разбиения текста на чанки с использованием RecursiveCharacterTextSplitter из Langchain.
@@ -26,46 +81,88 @@ class TextSplitter:
         :param separators: Список разделителей для RecursiveCharacterTextSplitter.
                            По умолчанию: ["\n\n", "\n", " ", ""] (двойной перенос, перенос, пробел, пустая строка).
         """
-        if RecursiveCharacterTextSplitter is None:
-            raise RuntimeError("RecursiveCharacterTextSplitter is not available. Please install 'langchain-text-splitters'.")
-
         if chunk_overlap >= chunk_size:
             raise ValueError(f"Chunk overlap ({chunk_overlap}) must be less than chunk size ({chunk_size})")
 
         self.chunk_size = chunk_size
         self.chunk_overlap = chunk_overlap
-        
+
         # Разделители по умолчанию для Langchain RecursiveCharacterTextSplitter
         # P.S.: Langchain по умолчанию использует: ["\n\n", "\n", " ", ""]
         # Если вы хотите свои, передайте их
         self.separators = separators
 
-
-        self.text_splitter = RecursiveCharacterTextSplitter(
-            chunk_size=self.chunk_size,
-            chunk_overlap=self.chunk_overlap,
-            separators=self.separators # Передаем опциональные разделители
-        )
-        logger.info(f"Langchain TextSplitter initialized with chunk_size={chunk_size}, chunk_overlap={chunk_overlap}")
-        if self.separators:
+        if separators is None:
+            # Набор по умолчанию покрывается быстрым жадным сплиттером —
+            # без рекурсии langchain по уровням разделителей.
+            self.text_splitter = FastCharacterSplitter(
+                chunk_size=self.chunk_size,
+                chunk_overlap=self.chunk_overlap,
+            )
+            logger.info(f"Fast TextSplitter initialized with chunk_size={chunk_size}, chunk_overlap={chunk_overlap}")
+        else:
+            if RecursiveCharacterTextSplitter is None:
+                raise RuntimeError("RecursiveCharacterTextSplitter is not available. Please install 'langchain-text-splitters'.")
+
+            self.text_splitter = RecursiveCharacterTextSplitter(
+                chunk_size=self.chunk_size,
+                chunk_overlap=self.chunk_overlap,
+                separators=self.separators # Передаем опциональные разделители
+            )
+            logger.info(f"Langchain TextSplitter initialized with chunk_size={chunk_size}, chunk_overlap={chunk_overlap}")
             logger.info(f"Custom separators used: {self.separators}")
 
+        # LRU-кэш результатов по 64-битному хэшу текста: пайплайны часто
+        # повторно обрабатывают одни и те же summary/detailed_notes между
+        # прогонами — попадание в кэш почти бесплатно.
+        self._cache: "OrderedDict[int, List[str]]" = OrderedDict()
+        self._cache_maxsize = 10_000
+
+    def _split_one(self, text: str) -> List[str]:
+        key = hash(text)
+        cached = self._cache.get(key)
+        if cached is not None:
+            self._cache.move_to_end(key)
+            return cached
+        chunks = self.text_splitter.split_text(text)
+        self._cache[key] = chunks
+        if len(self._cache) > self._cache_maxsize:
+            self._cache.popitem(last=False)
+        return chunks
+
     def split_text(self, text: Union[str, List[str]]) -> List[str]:
         """
         Разбивает один или несколько текстов на чанки с использованием Langchain text splitter.
+        Результаты мемоизируются по хэшу текста (LRU, 10k записей).
         :param text: Один текст (string) или список текстов (List[str]) для разбиения.
         :return: Список текстовых чанков.
         """
         if isinstance(text, str):
-            return self.text_splitter.split_text(text)
+            return self._split_one(text)
         elif isinstance(text, list):
-            all_chunks = []
-            for t in text:
-                all_chunks.extend(self.text_splitter.split_text(t))
-            return all_chunks
+            if isinstance(self.text_splitter, FastCharacterSplitter):
+                all_chunks: List[str] = []
+                for t in text:
+                    all_chunks.extend(self._split_one(t))
+                return all_chunks
+            # Один вызов create_documents вместо Python-цикла по текстам:
+            # весь список проходит через сплиттер за один проход.
+            docs = self.text_splitter.create_documents(text)
+            return [doc.page_content for doc in docs]
         else:
             raise TypeError(f"Input text must be a string or a list of strings, got {type(text)}")
 
+    def split_many(self, texts: List[str]) -> List[List[str]]:
+        """
+        Разбивает пакет текстов, сохраняя границы документов: возвращает
+        список списков чанков (по одному на входной текст). Каждый текст
+        проходит через общий мемо-кэш, так что повторяющиеся документы в
+        пакете режутся один раз.
+        :param texts: Список текстов для разбиения.
+        :return: Список списков чанков, по позиции соответствующих входу.
+        """
+        return [self._split_one(text) for text in texts]
+
 # Пример использования (можно добавить в if __name__ == "__main__": или в отдельный тестовый файл)
 if __name__ == "__main__":
     logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -1,13 +1,18 @@
 import os
 import logging
+import functools
 from abc import ABC, abstractmethod
 from typing import List, Dict, Any, Optional
 
+import numpy as np
+
 # Conditional import for OpenAI and SentenceTransformer
 # We'll put these in a try-except block in case not all dependencies are installed
 try:
+    import httpx  # ships with the openai client
     from openai import OpenAI
 except ImportError:
+    httpx = None
     OpenAI = None
     logging.warning("OpenAI library not found. OpenAI embedding models will not be available.")
 
@@ -17,6 +22,15 @@ except ImportError:
     SentenceTransformer = None
     logging.warning("Sentence Transformers library not found. HuggingFace embedding models will not be available.")
 
+try:
+    from optimum.onnxruntime import ORTModelForFeatureExtraction, ORTQuantizer
+    from optimum.onnxruntime.configuration import AutoQuantizationConfig
+except ImportError:
+    ORTModelForFeatureExtraction = None
+    ORTQuantizer = None
+    AutoQuantizationConfig = None
+    logging.warning("Optimum/onnxruntime libraries not found. ONNX int8 embedding models will not be available.")
+
 logger = logging.getLogger(__name__)
 
 class EmbeddingModel(ABC):
@@ -25,9 +39,21 @@ class EmbeddingModel(ABC):
     Defines the interface for generating text embeddings.
     """
     @abstractmethod
-    def get_embedding(self, text: str) -> List[float]:
+    def get_embedding(self, text: str) -> np.ndarray:
         """
-        Generates a numerical vector embedding for the given text.
+        Generates a numerical vector embedding for the given text as a
+        float32 ndarray of shape (D,). A packed buffer avoids boxing D
+        Python floats per vector and feeds Qdrant/NumPy consumers directly.
+        """
+        pass
+
+    @abstractmethod
+    def get_embeddings(self, texts: List[str]) -> np.ndarray:
+        """
+        Generates embeddings for a batch of texts in a single call and
+        returns a float32 ndarray of shape (N, D).
+        Implementations should amortize per-call overhead (one forward pass /
+        one API request for the whole batch) instead of looping over texts.
         """
         pass
 
@@ -50,8 +76,18 @@ class OpenRouterOpenAIEmbeddingModel(EmbeddingModel):
             raise ImportError("OpenAI library is not installed. Please install it with 'pip install openai'.")
         
         self.model_name = model_name
-        self.client = OpenAI(api_key=api_key, base_url=base_url)
-        
+
+        # Persistent connection pool shared across all embedding calls:
+        # TLS handshake and TCP slow-start are paid once, and HTTP/2 (when
+        # the h2 extra is installed) multiplexes concurrent requests over
+        # a single stream.
+        limits = httpx.Limits(max_connections=32, max_keepalive_connections=32)
+        try:
+            self._http = httpx.Client(http2=True, timeout=30, limits=limits)
+        except ImportError:
+            self._http = httpx.Client(timeout=30, limits=limits)
+        self.client = OpenAI(api_key=api_key, base_url=base_url, http_client=self._http)
+
         # Determine vector_size. For 'text-embedding-ada-002' it's 1536.
         # For 'text-embedding-3-small', it can be dynamically set,
         # but for simplicity, we'll use common defaults or assume a known size.
@@ -68,7 +104,7 @@ class OpenRouterOpenAIEmbeddingModel(EmbeddingModel):
 
         logger.info(f"Initialized OpenRouter OpenAI Embedding Model: {self.model_name} (vector size: {self.vector_size})")
 
-    def get_embedding(self, text: str) -> List[float]:
+    def get_embedding(self, text: str) -> np.ndarray:
         """
         Generates an embedding using the specified OpenAI model via OpenRouter.
         """
@@ -80,11 +116,53 @@ class OpenRouterOpenAIEmbeddingModel(EmbeddingModel):
                 input=text,
                 model=self.model_name
             )
-            return response.data[0].embedding
+            return np.asarray(response.data[0].embedding, dtype=np.float32)
         except Exception as e:
             logger.error(f"Error generating embedding with OpenRouter OpenAI model {self.model_name}: {e}")
             raise
 
+    def get_embeddings(self, texts: List[str], batch_size: int = 512) -> np.ndarray:
+        """
+        Generates embeddings for a batch of texts with one HTTPS round-trip
+        per `batch_size` inputs. The /embeddings endpoint accepts a list of
+        strings, so network RTT is paid once per batch instead of once per
+        text. Transient failures are retried with exponential backoff.
+        """
+        import time
+
+        results: List[List[float]] = []  # raw API lists; packed into one ndarray at the end
+        for i in range(0, len(texts), batch_size):
+            batch = texts[i:i + batch_size]
+            for attempt in range(3):
+                try:
+                    response = self.client.embeddings.create(
+                        input=batch,
+                        model=self.model_name
+                    )
+                    # The API does not guarantee response order — sort by index.
+                    results.extend(d.embedding for d in sorted(response.data, key=lambda d: d.index))
+                    break
+                except Exception as e:
+                    if attempt == 2:
+                        logger.error(f"Error generating embeddings with OpenRouter OpenAI model {self.model_name}: {e}")
+                        raise
+                    delay = 2 ** attempt
+                    logger.warning(f"Embeddings batch failed (attempt {attempt + 1}/3), retrying in {delay}s: {e}")
+                    time.sleep(delay)
+        return np.asarray(results, dtype=np.float32)
+
+    def close(self) -> None:
+        """
+        Closes the underlying HTTP connection pool.
+        """
+        self._http.close()
+
+    def __del__(self):
+        try:
+            self.close()
+        except Exception:
+            pass
+
     @property
     def vector_size(self) -> int:
         return self._vector_size
@@ -94,24 +172,221 @@ class HFEmbeddingModel(EmbeddingModel):
     """
     Embedding model using a Hugging Face Sentence Transformer model.
     """
-    def __init__(self, model_name: str = "sentence-transformers/paraphrase-multilingual-mpnet-base-v2"):
+    def __init__(self, model_name: str = "sentence-transformers/paraphrase-multilingual-mpnet-base-v2",
+                 precision: str = "fp32"):
         if SentenceTransformer is None:
             raise ImportError("Sentence Transformers library is not installed. Please install it with 'pip install sentence-transformers'.")
-        
+
+        import torch  # sentence-transformers guarantees torch is present
+
         self.model_name = model_name
-        self.model = SentenceTransformer(model_name)
+        self.precision = precision
+
+        # Автовыбор устройства: на GPU дополнительно доступны fp16/bf16 —
+        # вдвое меньше трафика по памяти и тензорные ядра на matmul.
+        device = "cuda" if torch.cuda.is_available() else "cpu"
+        self.model = SentenceTransformer(model_name, device=device)
+
+        if precision == "fp16":
+            self.model = self.model.half()
+        elif precision == "bf16":
+            self.model = self.model.to(torch.bfloat16)
+        elif precision != "fp32":
+            raise ValueError(f"Unsupported precision '{precision}'. Expected 'fp32', 'fp16' or 'bf16'.")
+
         self._vector_size = self.model.get_sentence_embedding_dimension()
-        logger.info(f"Initialized Hugging Face Embedding Model: {self.model_name} (vector size: {self.vector_size})")
+        logger.info(f"Initialized Hugging Face Embedding Model: {self.model_name} "
+                    f"(vector size: {self.vector_size}, device: {device}, precision: {precision})")
 
-    def get_embedding(self, text: str) -> List[float]:
+    def get_embedding(self, text: str) -> np.ndarray:
         """
         Generates an embedding using the loaded Sentence Transformer model.
         """
+        return self.get_embeddings([text])[0]
+
+    def get_embeddings(self, texts: List[str], batch_size: int = 64) -> np.ndarray:
+        """
+        Generates embeddings for a batch of texts in one encode call.
+        SentenceTransformer pads the batch into a single tensor, so the whole
+        list shares one forward pass per batch instead of one per text.
+        The (N, D) float32 ndarray is returned as-is — no .tolist() boxing.
+        """
         try:
-            # convert_to_tensor=False ensures a numpy array, then tolist() for List[float]
-            return self.model.encode(text, convert_to_tensor=False).tolist()
+            return self.model.encode(
+                texts,
+                batch_size=batch_size,
+                show_progress_bar=False,
+                convert_to_numpy=True,
+            ).astype(np.float32, copy=False)
         except Exception as e:
-            logger.error(f"Error generating embedding with HF model {self.model_name}: {e}")
+            logger.error(f"Error generating embeddings with HF model {self.model_name}: {e}")
+            raise
+
+    @property
+    def vector_size(self) -> int:
+        return self._vector_size
+
+
+# --- Worker-process helpers for ParallelHFEmbeddingModel -------------------
+# One model instance per worker process, created by the pool initializer.
+_WORKER_MODEL: Optional["HFEmbeddingModel"] = None
+
+
+def _init_hf_worker(model_name: str, precision: str, threads_per_worker: int) -> None:
+    global _WORKER_MODEL
+    import torch
+    # Cap intra-op threads so N workers don't oversubscribe the cores.
+    torch.set_num_threads(threads_per_worker)
+    _WORKER_MODEL = HFEmbeddingModel(model_name=model_name, precision=precision)
+
+
+def _worker_vector_size() -> int:
+    return _WORKER_MODEL.vector_size
+
+
+def _encode_in_worker(texts: List[str]) -> "np.ndarray":
+    return _WORKER_MODEL.get_embeddings(texts)
+
+
+class ParallelHFEmbeddingModel(EmbeddingModel):
+    """
+    CPU-parallel wrapper around HFEmbeddingModel: one model per worker
+    process, batches sharded across workers. Escapes the GIL for bulk
+    ingest on multi-core hosts where CUDA is unavailable; scales roughly
+    linearly up to the number of physical cores.
+    """
+    def __init__(self, model_name: str = "sentence-transformers/paraphrase-multilingual-mpnet-base-v2",
+                 precision: str = "fp32", max_workers: Optional[int] = None):
+        if SentenceTransformer is None:
+            raise ImportError("Sentence Transformers library is not installed. Please install it with 'pip install sentence-transformers'.")
+
+        from concurrent.futures import ProcessPoolExecutor
+
+        self.model_name = model_name
+        self.precision = precision
+        self.max_workers = max_workers or max(1, (os.cpu_count() or 2) // 2)
+
+        self._pool = ProcessPoolExecutor(
+            max_workers=self.max_workers,
+            initializer=_init_hf_worker,
+            initargs=(model_name, precision, 2),
+        )
+        # Forces worker initialization and fetches the dimensionality once.
+        self._vector_size = self._pool.submit(_worker_vector_size).result()
+        logger.info(f"Initialized Parallel HF Embedding Model: {self.model_name} "
+                    f"(vector size: {self._vector_size}, workers: {self.max_workers})")
+
+    def get_embedding(self, text: str) -> np.ndarray:
+        """
+        Generates an embedding in one of the worker processes.
+        """
+        return self.get_embeddings([text])[0]
+
+    def get_embeddings(self, texts: List[str]) -> np.ndarray:
+        """
+        Shards the batch across worker processes and concatenates the
+        resulting (n_i, D) arrays in input order.
+        """
+        if not texts:
+            return np.empty((0, self._vector_size), dtype=np.float32)
+        shard_size = max(1, -(-len(texts) // self.max_workers))  # ceil div
+        shards = [texts[i:i + shard_size] for i in range(0, len(texts), shard_size)]
+        futures = [self._pool.submit(_encode_in_worker, shard) for shard in shards]
+        return np.concatenate([f.result() for f in futures], axis=0)
+
+    def close(self) -> None:
+        """
+        Shuts down the worker pool.
+        """
+        self._pool.shutdown()
+
+    def __del__(self):
+        try:
+            self.close()
+        except Exception:
+            pass
+
+    @property
+    def vector_size(self) -> int:
+        return self._vector_size
+
+
+class ONNXInt8EmbeddingModel(EmbeddingModel):
+    """
+    Embedding model running an int8-quantized ONNX export of a Hugging Face encoder.
+    Dynamic quantization cuts CPU GEMM bandwidth roughly 4x vs FP32 (VNNI int8
+    kernels in onnxruntime) with negligible recall loss on mpnet-class models.
+    """
+    def __init__(self, model_name: str = "sentence-transformers/paraphrase-multilingual-mpnet-base-v2"):
+        if ORTModelForFeatureExtraction is None:
+            raise ImportError("Optimum/onnxruntime are not installed. Please install them with 'pip install optimum[onnxruntime]'.")
+
+        from transformers import AutoTokenizer
+
+        self.model_name = model_name
+
+        # Экспорт и квантование делаются один раз и кэшируются на диске;
+        # последующие запуски просто грузят готовый model_quantized.onnx.
+        cache_dir = os.path.join(
+            os.path.expanduser("~"), ".cache", "ai_scout", "onnx-int8",
+            model_name.replace("/", "__")
+        )
+        quantized_file = os.path.join(cache_dir, "model_quantized.onnx")
+
+        if not os.path.exists(quantized_file):
+            logger.info(f"Exporting and int8-quantizing '{model_name}' into {cache_dir} (one-off)...")
+            os.makedirs(cache_dir, exist_ok=True)
+            exported = ORTModelForFeatureExtraction.from_pretrained(model_name, export=True)
+            exported.save_pretrained(cache_dir)
+            quantizer = ORTQuantizer.from_pretrained(cache_dir)
+            quantizer.quantize(
+                save_dir=cache_dir,
+                quantization_config=AutoQuantizationConfig.avx512_vnni(is_static=False),
+            )
+
+        self.tokenizer = AutoTokenizer.from_pretrained(model_name)
+        self.model = ORTModelForFeatureExtraction.from_pretrained(cache_dir, file_name="model_quantized.onnx")
+        self._vector_size = self.model.config.hidden_size
+        logger.info(f"Initialized ONNX int8 Embedding Model: {self.model_name} (vector size: {self.vector_size})")
+
+    def get_embedding(self, text: str) -> np.ndarray:
+        """
+        Generates an embedding through the quantized ONNX session.
+        """
+        return self.get_embeddings([text])[0]
+
+    def get_embeddings(self, texts: List[str], batch_size: int = 64) -> np.ndarray:
+        """
+        Generates embeddings for a batch of texts with length-sorted
+        mini-batching: texts are sorted by length so each mini-batch pads
+        only up to its own longest member, instead of every batch padding
+        to the global maximum. Padding FLOPs dominate on short-chunk
+        workloads, so this roughly halves wasted compute. Results are
+        written back in input order.
+        (SentenceTransformer's encode() already does this internally for
+        the HF model; here we replicate it for the raw ONNX session.)
+        """
+        import torch
+
+        if not texts:
+            return np.empty((0, self._vector_size), dtype=np.float32)
+
+        order = sorted(range(len(texts)), key=lambda i: len(texts[i]))
+        vectors = np.empty((len(texts), self._vector_size), dtype=np.float32)
+        try:
+            for start in range(0, len(order), batch_size):
+                idx = order[start:start + batch_size]
+                batch = [texts[i] for i in idx]
+                inputs = self.tokenizer(batch, padding=True, truncation=True, return_tensors="pt")
+                with torch.no_grad():
+                    hidden = self.model(**inputs).last_hidden_state
+                mask = inputs["attention_mask"].unsqueeze(-1).to(hidden.dtype)
+                pooled = (hidden * mask).sum(dim=1) / mask.sum(dim=1).clamp(min=1e-9)
+                # Fancy indexing restores the original input order.
+                vectors[idx] = pooled.cpu().numpy().astype(np.float32, copy=False)
+            return vectors
+        except Exception as e:
+            logger.error(f"Error generating embeddings with ONNX int8 model {self.model_name}: {e}")
             raise
 
     @property
@@ -145,7 +420,7 @@ def create_embedding_model(config: Dict[str, Any]) -> EmbeddingModel:
     """
     # Logic for creating concrete classes
     model_type = config.get("type")
-    
+
     if model_type == "openrouter_openai":
         model_name = config.get("model_name")
         api_key_env = config.get("api_key_env") # Name of the environment variable holding the API key
@@ -155,17 +430,43 @@ def create_embedding_model(config: Dict[str, Any]) -> EmbeddingModel:
             raise ValueError("Configuration for 'openrouter_openai' model missing 'model_name'.")
         if not api_key_env:
             raise ValueError("Configuration for 'openrouter_openai' model missing 'api_key_env'.")
-        
-        api_key = os.getenv(api_key_env)
-        if not api_key:
-            raise ValueError(f"API key environment variable '{api_key_env}' not set for OpenRouter OpenAI model.")
-        
-        return OpenRouterOpenAIEmbeddingModel(model_name=model_name, api_key=api_key, base_url=base_url)
-    
+
+        model = _create_cached(model_type, model_name, api_key_env, base_url, None, None, None)
+
     elif model_type == "hf":
         model_name = config.get("model_name", "sentence-transformers/paraphrase-multilingual-mpnet-base-v2")
-        return HFEmbeddingModel(model_name=model_name)
-    
+        model = _create_cached(model_type, model_name, None, None,
+                               config.get("precision", "fp32"), config.get("backend"), config.get("workers"))
+
     else:
         raise ValueError(f"Unsupported embedding model type: {model_type}")
 
+    cache_path = config.get("cache_path")
+    if cache_path:
+        # Persistent on-disk cache: re-runs over unchanged text skip the model.
+        from src.embeddings.cache import CachedEmbeddingModel
+        model = CachedEmbeddingModel(model, cache_path)
+    return model
+
+
+@functools.lru_cache(maxsize=8)
+def _create_cached(model_type: str, model_name: str, api_key_env: Optional[str], base_url: Optional[str],
+                   precision: Optional[str], backend: Optional[str], workers: Optional[int]) -> EmbeddingModel:
+    """
+    Memoized model constructor: repeated factory calls with the same config
+    (config reload, multiple pipelines, tests) return the same instance
+    instead of re-loading gigabyte-scale weights per call. The cache key
+    holds the API key *env var name*, never the key value itself.
+    """
+    if model_type == "openrouter_openai":
+        api_key = os.getenv(api_key_env)
+        if not api_key:
+            raise ValueError(f"API key environment variable '{api_key_env}' not set for OpenRouter OpenAI model.")
+        return OpenRouterOpenAIEmbeddingModel(model_name=model_name, api_key=api_key, base_url=base_url)
+
+    if backend == "onnx-int8":
+        return ONNXInt8EmbeddingModel(model_name=model_name)
+    if workers and workers > 1:
+        return ParallelHFEmbeddingModel(model_name=model_name, precision=precision, max_workers=workers)
+    return HFEmbeddingModel(model_name=model_name, precision=precision)
+
@@ -3,6 +3,12 @@ from typing import List, Dict, Any, Optional
 from src.vector_store.schemas import ScoredPoint  # Импорт ScoredPoint из ваших схем
 from datetime import datetime
 
+# tiktoken опционален: без него остаётся старая аппроксимация по словам.
+try:
+    import tiktoken
+except ImportError:
+    tiktoken = None
+
 logger = logging.getLogger(__name__)
 
 class Formatter:
@@ -14,6 +20,14 @@ class Formatter:
         """
         self.max_tokens_per_chunk = max_tokens_per_chunk
         self.max_chunks = max_chunks
+        # Кодировщик загружается один раз здесь: get_encoding тянет BPE-словарь
+        # с диска, а encode/decode в цикле — уже дешёвые вызовы.
+        self._encoding = None
+        if tiktoken is not None:
+            try:
+                self._encoding = tiktoken.get_encoding("cl100k_base")
+            except Exception:
+                logger.warning("tiktoken encoding unavailable; falling back to word-based truncation.")
         logger.info("Formatter initialized.")
 
     def format_context(self, search_results: List[Dict[str, Any]], include_metadata: bool = True) -> str:
@@ -29,23 +43,35 @@ class Formatter:
             
             # Основной текст (chunk)
             chunk_text = payload.get('text_chunk', 'N/A')
-            # Truncate если слишком длинный (простая аппроксимация по словам)
-            words = chunk_text.split()
-            if len(words) > self.max_tokens_per_chunk // 5:  # Примерно 5 слов на 1 токен
-                chunk_text = ' '.join(words[:self.max_tokens_per_chunk // 5]) + '...'
-            
-            part = f"[{i+1}] Case ID: {payload.get('case_id', 'N/A')}, Score: {result['score']:.3f}\n"
-            part += f"Title: {payload.get('title', 'N/A')}\n"
-            part += f"Summary: {payload.get('summary', 'N/A')}\n"
-            part += f"Content: {chunk_text}\n"
+            # Truncate если слишком длинный
+            if self._encoding is not None:
+                # Точная обрезка по токенам: срез списка токенов + decode,
+                # бюджет контекста LLM не переливается и не недоливается.
+                tokens = self._encoding.encode(chunk_text)
+                if len(tokens) > self.max_tokens_per_chunk:
+                    chunk_text = self._encoding.decode(tokens[:self.max_tokens_per_chunk]) + '...'
+            else:
+                # Простая аппроксимация по словам: примерно 5 слов на 1 токен
+                words = chunk_text.split()
+                if len(words) > self.max_tokens_per_chunk // 5:
+                    chunk_text = ' '.join(words[:self.max_tokens_per_chunk // 5]) + '...'
             
+            # Строки копятся в списке и склеиваются одним join: конкатенация
+            # += пересоздаёт строку на каждом шаге (квадратичная стоимость).
+            part_lines = [
+                f"[{i+1}] Case ID: {payload.get('case_id', 'N/A')}, Score: {result['score']:.3f}",
+                f"Title: {payload.get('title', 'N/A')}",
+                f"Summary: {payload.get('summary', 'N/A')}",
+                f"Content: {chunk_text}",
+            ]
+
             if include_metadata:
-                part += f"Region: {payload.get('region_name', 'N/A')}, Sector: {payload.get('sector_name', 'N/A')}, Maturity: {payload.get('maturity_level_code', 'N/A')}\n"
+                part_lines.append(f"Region: {payload.get('region_name', 'N/A')}, Sector: {payload.get('sector_name', 'N/A')}, Maturity: {payload.get('maturity_level_code', 'N/A')}")
                 if 'created_at' in payload and payload['created_at']:
-                    part += f"Created At: {payload['created_at'].strftime('%Y-%m-%d') if isinstance(payload['created_at'], datetime) else payload['created_at']}\n"
-            
-            context_parts.append(part)
-        
+                    part_lines.append(f"Created At: {payload['created_at'].strftime('%Y-%m-%d') if isinstance(payload['created_at'], datetime) else payload['created_at']}")
+
+            context_parts.append("\n".join(part_lines) + "\n")
+
         return "\n".join(context_parts)
 
 # Пример использования (можно добавить в конец файла для теста):
@@ -1,47 +1,74 @@
 import logging
-from typing import List, Dict, Any, Optional
-from qdrant_client.http.models import Filter, FieldCondition, MatchValue, MatchAny
+from functools import lru_cache
+from typing import List, Dict, Any, Optional, Tuple
 
 from src.vector_store.qdrant_client import QdrantClient
 from src.embeddings.models.embedding_model import create_embedding_model
-from src.utils.logger_config import setup_logging  # Предполагаю, что есть
 
-setup_logging()
+# Настройка логирования — ответственность точки входа (cli/*), а не модуля:
+# импорт retriever не должен перенастраивать logging всего процесса.
 logger = logging.getLogger(__name__)
 
+
+@lru_cache(maxsize=1024)
+def _build_filter_cached(frozen: Tuple[Tuple[str, Any], ...]) -> "Filter":
+    """Собирает Filter из замороженного представления (кортежи вместо списков)."""
+    # Ленивый импорт: модели qdrant тянут pydantic-схемы и заметно
+    # удорожают импорт модуля; нужны они только при поиске с фильтрами.
+    from qdrant_client.http.models import Filter, FieldCondition, MatchValue, MatchAny
+
+    must_conditions = [
+        FieldCondition(key=key, match=MatchAny(any=list(value)))
+        if isinstance(value, tuple)
+        else FieldCondition(key=key, match=MatchValue(value=value))
+        for key, value in frozen
+    ]
+    return Filter(must=must_conditions)
+
 class Retriever:
     def __init__(self, qdrant_client: QdrantClient, embedding_model, collection_name: str):
         self.qdrant_client = qdrant_client
         self.embedding_model = embedding_model  # Инициализированная модель для векторизации запросов
         self.collection_name = collection_name
+        # LRU-кэш эмбеддингов запросов на инстанс (а не на класс, чтобы не
+        # удерживать self навсегда): повторный вопрос не ходит в модель.
+        self._embed_query = lru_cache(maxsize=1024)(self._embed_query_impl)
         logger.info("Retriever initialized.")
 
-    def build_filter(self, filters: Dict[str, Any]) -> Optional[Filter]:
+    def _embed_query_impl(self, query: str) -> Tuple[float, ...]:
+        query_vector = self.embedding_model.get_embedding(query)
+        if isinstance(query_vector, list):
+            pass  # Уже список
+        elif hasattr(query_vector, 'tolist'):
+            query_vector = query_vector.tolist()
+        else:
+            raise TypeError("Embedding должен быть list или ndarray для Qdrant.")
+        # Кортеж — чтобы закэшированное значение было иммутабельным.
+        return tuple(query_vector)
+
+    def build_filter(self, filters: Dict[str, Any]) -> Optional["Filter"]:
         """Строит Filter для Qdrant из словаря (e.g., {'region_id': 3, 'sector_id': 44})."""
-        must_conditions = []
+        # Словарь приводится к хэшируемому кортежу (списки -> кортежи), и
+        # готовые Filter-объекты мемоизируются: пользователи гоняют одни и те
+        # же регионы/секторы, а валидация pydantic-моделей не бесплатна.
+        frozen = []
         for key, value in filters.items():
-            if isinstance(value, (int, float)):
-                must_conditions.append(FieldCondition(key=key, match=MatchValue(value=value)))
-            elif isinstance(value, str):
-                must_conditions.append(FieldCondition(key=key, match=MatchValue(value=value)))
-            elif isinstance(value, list):
-                must_conditions.append(FieldCondition(key=key, match=MatchAny(any=value)))
+            if isinstance(value, list):
+                frozen.append((key, tuple(value)))
+            elif isinstance(value, (int, float, str)):
+                frozen.append((key, value))
             else:
                 logger.warning(f"Unsupported filter type for {key}: {type(value)}")
-        return Filter(must=must_conditions) if must_conditions else None
+        if not frozen:
+            return None
+        return _build_filter_cached(tuple(sorted(frozen)))
 
     def search(self, query: str, top_k: int = 5, filters: Dict[str, Any] = None) -> List[Dict[str, Any]]:
         """Выполняет векторный поиск по запросу + фильтры, возвращает релевантные чанки."""
         try:
             logger.info(f"Searching for query: '{query}' with filters: {filters} (top_k: {top_k})")
-            # Векторизируем запрос
-            query_vector = self.embedding_model.get_embedding(query)
-            if isinstance(query_vector, list):
-                pass  # Уже список
-            elif hasattr(query_vector, 'tolist'):
-                query_vector = query_vector.tolist()
-            else:
-                raise TypeError("Embedding должен быть list или ndarray для Qdrant.")
+            # Векторизируем запрос (повторные запросы берутся из LRU-кэша)
+            query_vector = list(self._embed_query(query))
 
             # Строим фильтр
             qdrant_filter = self.build_filter(filters) if filters else None
@@ -1,3 +1,4 @@
+from functools import lru_cache
 from typing import Any, Dict, List, Optional
 import re
 
@@ -9,6 +10,85 @@ EMOJI_RE = re.compile(r"[\U0001F300-\U0001FAFF\U00002500-\U00002BEF]+", re.UNICO
 SCENARIO_RE = re.compile(r"\*\*(.+?)\*\*\s*[–—-]\s*(.+)")
 DRIVER_SPLIT_RE = re.compile(r"\s*(?:\+|,|;|/| и | and )\s*", re.IGNORECASE)
 INDEX_CELL_RE = re.compile(r"^\d+(\.\d+)?$")
+TITLE_SPLIT_RE = re.compile(r"\s*-\s*")
+WHITESPACE_RE = re.compile(r"\s+")
+HEADER_NON_ALNUM_RE = re.compile(r"[^0-9a-zA-ZА-Яа-я]+")
+# A table row: optional leading whitespace then "|", up to end of line.
+TABLE_LINE_RE = re.compile(r"^[^\S\n]*\|.*$", re.MULTILINE)
+
+
+# String helpers are module-level so they are defined once (not rebuilt as
+# closures on every parse_agent_output call) and can memoize their results:
+# sector names, headers and region labels repeat heavily across table rows.
+
+@lru_cache(maxsize=4096)
+def _strip_markdown(text: str) -> str:
+    cleaned = text.replace("**", "").replace("__", "").replace("`", "")
+    cleaned = cleaned.replace("–", "-").replace("—", "-")
+    return " ".join(cleaned.split())
+
+
+@lru_cache(maxsize=512)
+def _clean_region_name(raw: str) -> str:
+    cleaned = EMOJI_RE.sub("", raw).strip()
+    return " ".join(cleaned.split())
+
+
+@lru_cache(maxsize=512)
+def _normalize_header_text(header: str) -> str:
+    normalized = HEADER_NON_ALNUM_RE.sub(" ", header.lower())
+    return WHITESPACE_RE.sub(" ", normalized).strip()
+
+
+def _extract_title_and_summary(cell: str) -> tuple[str, str]:
+    match = SCENARIO_RE.search(cell)
+    if match:
+        title = _strip_markdown(match.group(1))
+        summary = match.group(2).strip()
+        return title, summary
+    stripped = _strip_markdown(cell)
+    parts = TITLE_SPLIT_RE.split(stripped, maxsplit=1)
+    if len(parts) == 2:
+        return parts[0].strip(), parts[1].strip()
+    return stripped, ""
+
+
+def _parse_technology_drivers(cell: str) -> List[str]:
+    if not cell:
+        return []
+    normalized = cell.replace("\u202f", " ").replace(" ", " ")
+    candidates = [
+        WHITESPACE_RE.sub(" ", item).strip(" .")
+        for item in DRIVER_SPLIT_RE.split(normalized)
+    ]
+    return [c for c in candidates if c]
+
+
+def _build_effects(effect_text: str) -> List[Dict[str, Any]]:
+    cleaned = _strip_markdown(effect_text)
+    if not cleaned:
+        return []
+    return [
+        {
+            "effect_type": "text_note",
+            "value_numeric": None,
+            "currency": None,
+            "period_note": cleaned,
+        }
+    ]
+
+
+def _find_column_index(headers: List[str], keywords: List[str]) -> Optional[int]:
+    for idx, header in enumerate(headers):
+        if any(keyword in header for keyword in keywords):
+            return idx
+    return None
+
+
+def _safe_get(cells: List[str], idx: Optional[int]) -> str:
+    if idx is None or idx < 0 or idx >= len(cells):
+        return ""
+    return cells[idx]
 
 
 def _persist_cases(agent_output: str) -> None:
@@ -16,78 +96,14 @@ def _persist_cases(agent_output: str) -> None:
     session = SessionLocal()
     repo = CaseRepository(session)
     try:
-        for payload in parse_agent_output(agent_output):
-            repo.save_case(
-                case_data=payload["case"],
-                economic_effects_data=payload["economic_effects"],
-                driver_names=payload["technology_drivers"],
-            )
+        # One transaction for the whole parse instead of a commit per case.
+        repo.save_cases_bulk(parse_agent_output(agent_output))
     finally:
         session.close()
 
 
 def parse_agent_output(agent_output: str) -> List[Dict[str, Any]]:
     """Convert raw agent output into structured case payloads."""
-
-    def _strip_markdown(text: str) -> str:
-        cleaned = text.replace("**", "").replace("__", "").replace("`", "")
-        cleaned = cleaned.replace("–", "-").replace("—", "-")
-        return " ".join(cleaned.split())
-
-    def _clean_region_name(raw: str) -> str:
-        cleaned = EMOJI_RE.sub("", raw).strip()
-        return " ".join(cleaned.split())
-
-    def _extract_title_and_summary(cell: str) -> tuple[str, str]:
-        match = SCENARIO_RE.search(cell)
-        if match:
-            title = _strip_markdown(match.group(1))
-            summary = match.group(2).strip()
-            return title, summary
-        stripped = _strip_markdown(cell)
-        parts = re.split(r"\s*-\s*", stripped, maxsplit=1)
-        if len(parts) == 2:
-            return parts[0].strip(), parts[1].strip()
-        return stripped, ""
-
-    def _parse_technology_drivers(cell: str) -> List[str]:
-        if not cell:
-            return []
-        normalized = cell.replace("\u202f", " ").replace(" ", " ")
-        candidates = [
-            re.sub(r"\s+", " ", item).strip(" .")
-            for item in DRIVER_SPLIT_RE.split(normalized)
-        ]
-        return [c for c in candidates if c]
-
-    def _build_effects(effect_text: str) -> List[Dict[str, Any]]:
-        cleaned = _strip_markdown(effect_text)
-        if not cleaned:
-            return []
-        return [
-            {
-                "effect_type": "text_note",
-                "value_numeric": None,
-                "currency": None,
-                "period_note": cleaned,
-            }
-        ]
-
-    def _normalize_header_text(header: str) -> str:
-        normalized = re.sub(r"[^0-9a-zA-ZА-Яа-я]+", " ", header.lower())
-        return re.sub(r"\s+", " ", normalized).strip()
-
-    def _find_column_index(headers: List[str], keywords: List[str]) -> Optional[int]:
-        for idx, header in enumerate(headers):
-            if any(keyword in header for keyword in keywords):
-                return idx
-        return None
-
-    def _safe_get(cells: List[str], idx: Optional[int]) -> str:
-        if idx is None or idx < 0 or idx >= len(cells):
-            return ""
-        return cells[idx]
-
     payloads: List[Dict[str, Any]] = []
     section_matches = list(SECTION_HEADER_RE.finditer(agent_output))
 
@@ -102,7 +118,9 @@ def parse_agent_output(agent_output: str) -> List[Dict[str, Any]]:
         )
         body = agent_output[start:end]
 
-        table_lines = [ln for ln in body.splitlines() if ln.strip().startswith("|")]
+        # Regex scan instead of splitlines(): non-table lines are skipped in
+        # C code without materializing every line of the section body.
+        table_lines = TABLE_LINE_RE.findall(body)
         if not table_lines:
             continue
 
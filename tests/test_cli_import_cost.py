@@ -0,0 +1,29 @@
+"""
+Регрессионный тест на ленивые импорты CLI: сам импорт модулей команд не
+должен тянуть тяжелый стек (torch, transformers, qdrant_client,
+langgraph) — он загружается только внутри тела команды. Иначе даже
+`--help` платит полную стоимость холодного старта.
+"""
+import importlib
+import sys
+
+import pytest
+
+HEAVY_MODULES = ("torch", "transformers", "qdrant_client", "langgraph")
+CLI_MODULES = ("src.cli.search", "src.cli.ingest", "src.cli.report")
+
+
+@pytest.mark.parametrize("cli_module", CLI_MODULES)
+def test_cli_import_does_not_pull_heavy_deps(cli_module):
+    # Учитываем только то, что загрузил сам импорт CLI-модуля: тяжелые
+    # пакеты могли попасть в sys.modules раньше (другим тестом).
+    already_loaded = {name for name in HEAVY_MODULES if name in sys.modules}
+
+    importlib.import_module(cli_module)
+
+    pulled = [name for name in HEAVY_MODULES
+              if name in sys.modules and name not in already_loaded]
+    assert not pulled, (
+        f"Импорт {cli_module} загрузил тяжелые модули {pulled}; "
+        f"они должны импортироваться лениво, внутри тела команды."
+    )
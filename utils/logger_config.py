@@ -1,9 +1,26 @@
 import os
 import logging
 import logging.config
+from functools import lru_cache
+
 import yaml
 from pathlib import Path
 
+# C-реализация загрузчика (libyaml) парсит на порядок быстрее чистого Python;
+# safe_load без неё остаётся корректным fallback'ом.
+try:
+    from yaml import CSafeLoader as _YamlLoader
+except ImportError:
+    from yaml import SafeLoader as _YamlLoader
+
+
+@lru_cache(maxsize=4)
+def _load_yaml_config(path):
+    """Читает и парсит YAML-конфиг логирования; результат кэшируется по пути."""
+    with open(path, 'rt') as f:
+        return yaml.load(f.read(), Loader=_YamlLoader)
+
+
 def setup_logging(
     default_path='src/configs/logging.yaml',
     default_level=logging.INFO,
@@ -18,8 +35,9 @@ def setup_logging(
         path = value
     
     if Path(path).exists():
-        with open(path, 'rt') as f:
-            config = yaml.safe_load(f.read())
+        # CLI-команды и воркеры зовут setup_logging повторно: повторный вызов
+        # берёт уже распарсенный конфиг из кэша, а не читает YAML заново.
+        config = _load_yaml_config(path)
         logging.config.dictConfig(config)
         logging.getLogger(__name__).info(f"Logging configured from {path}")
     else:
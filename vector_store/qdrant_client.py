@@ -1,35 +1,148 @@
 import os
+import asyncio
 import logging
 from datetime import datetime # Добавлен импорт для примера использования
-from typing import List, Dict, Any, Optional
+import random
+import time
+from functools import lru_cache, wraps
+from typing import Iterator, List, Dict, Any, Hashable, Optional
+
+import grpc
+import numpy as np
 
 from qdrant_client import QdrantClient as QdrantNativeClient # Переименовал, чтобы избежать конфликта имен
-from qdrant_client.http.exceptions import UnexpectedResponse
+from qdrant_client import AsyncQdrantClient
+from qdrant_client.http.exceptions import UnexpectedResponse, ResponseHandlingException
 from qdrant_client.http import models
 
 from src.vector_store.schemas import CasePayload, ScoredPoint # Импортируем наши схемы
 
 logger = logging.getLogger(__name__)
 
+
+@lru_cache(maxsize=1024)
+def _make_eq_filter(key: str, value: Hashable) -> models.Filter:
+    """
+    Кэш готовых фильтров равенства "поле == значение": pydantic-модели
+    Filter/FieldCondition не бесплатны в конструировании, а горячие формы
+    фильтров (sector_id, region_name) повторяются от запроса к запросу.
+    """
+    return models.Filter(
+        must=[models.FieldCondition(key=key, match=models.MatchValue(value=value))]
+    )
+
+
+# Бюджет повторов для сетевых операций: 5 попыток с экспоненциальной
+# задержкой и полным джиттером, потолок паузы — 5 секунд.
+# Транзиентные сбои приходят по-разному в зависимости от транспорта:
+# UnexpectedResponse — REST-путь, grpc.RpcError — gRPC (транспорт по
+# умолчанию), ResponseHandlingException — обертка клиента над обрывами
+# соединения. Ретраим все три.
+_RETRYABLE_EXCEPTIONS = (UnexpectedResponse, ResponseHandlingException, grpc.RpcError)
+_RETRY_ATTEMPTS = 5
+_RETRY_BASE_DELAY = 0.1
+_RETRY_MAX_DELAY = 5.0
+
+
+def _retry_on_unexpected_response(func):
+    """
+    Повторяет вызов при транзиентных ошибках Qdrant (перегрузка, рестарт,
+    обрыв за прокси): транзиентные сбои гасятся на месте, а не роняют весь
+    пайплайн загрузки. Задержка растет экспоненциально со случайным
+    джиттером, чтобы повторные запросы конкурентных воркеров не приходили
+    синхронной волной. После исчерпания бюджета исключение уходит вызывающему.
+    """
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        for attempt in range(_RETRY_ATTEMPTS):
+            try:
+                return func(*args, **kwargs)
+            except _RETRYABLE_EXCEPTIONS as e:
+                if attempt == _RETRY_ATTEMPTS - 1:
+                    raise
+                delay = random.uniform(0, min(_RETRY_MAX_DELAY, _RETRY_BASE_DELAY * (2 ** attempt)))
+                logger.warning(
+                    f"Транзиентная ошибка Qdrant в {func.__name__} "
+                    f"(попытка {attempt + 1}/{_RETRY_ATTEMPTS}), повтор через {delay:.2f} с: {e}"
+                )
+                time.sleep(delay)
+    return wrapper
+
+
 class QdrantClient: # Переименован класс в QdrantClient
+    # Поля payload, по которым обычно фильтруют поисковые запросы
+    # (см. build_filter в rag/retriever.py и примеры ниже).
+    _INTEGER_INDEX_FIELDS = ('sector_id', 'region_id', 'company_id')
+    _KEYWORD_INDEX_FIELDS = ('region_name', 'implementation_status_code', 'maturity_level_code')
+
+    # Явные параметры HNSW вместо серверных умолчаний: главный рычаг
+    # баланса recall/латентность/RAM. Корпус кейсов небольшой, так что
+    # ef_construct поднят до 128 ради recall; full_scan_threshold оставляет
+    # мелкие сегменты на честном переборе, где он дешевле обхода графа.
+    _DEFAULT_HNSW_CONFIG = {"m": 16, "ef_construct": 128, "full_scan_threshold": 10000}
+
+    # Кэш общих инстансов для get_shared: повторное создание клиента
+    # открывает новые HTTP/gRPC-каналы (~100 мс на подключение).
+    _instances: Dict[tuple, "QdrantClient"] = {}
+
+    @classmethod
+    def get_shared(cls, **kwargs) -> "QdrantClient":
+        """
+        Возвращает общий инстанс клиента для комбинации (host, port,
+        collection_name, api_key), создавая его при первом обращении.
+        Серверный код и обработчики запросов должны брать клиент отсюда,
+        а не конструировать свой: соединения и пулы переиспользуются.
+        """
+        key = (
+            kwargs.get('host', 'localhost'),
+            kwargs.get('port', 6333),
+            kwargs.get('collection_name', 'ai_cases'),
+            kwargs.get('api_key'),
+        )
+        instance = cls._instances.get(key)
+        if instance is None:
+            instance = cls._instances.setdefault(key, cls(**kwargs))
+        return instance
+
     def __init__(self, host: str = "localhost", port: int = 6333, collection_name: str = "ai_cases",
-                 api_key: Optional[str] = None, grpc_port: Optional[int] = None, vector_size: Optional[int] = None):
+                 api_key: Optional[str] = None, grpc_port: Optional[int] = None, vector_size: Optional[int] = None,
+                 use_grpc: bool = True):
         """
         Инициализирует клиент Qdrant и настраивает коллекцию.
         :param host: Хост Qdrant сервера.
         :param port: Порт Qdrant HTTP API.
         :param collection_name: Имя коллекции для хранения кейсов.
         :param api_key: API ключ для аутентификации (если используется Qdrant Cloud или защищенный инстанс).
-        :param grpc_port: Порт gRPC API Qdrant (опционально).
+        :param grpc_port: Порт gRPC API Qdrant (по умолчанию 6334 при use_grpc=True).
         :param vector_size: Размерность векторов, которые будут храниться в коллекции.
                             Обязателен при создании или пересоздании коллекции.
+        :param use_grpc: Ходить в Qdrant по gRPC (protobuf вместо JSON поверх
+                         HTTP/1.1) — заметно дешевле на тяжелых upsert/search
+                         запросах, где в полезной нагрузке доминируют векторы.
         """
-        self.client = QdrantNativeClient( # Используем переименованный импорт
-            host=host,
-            port=port,
-            grpc_port=grpc_port,
-            api_key=api_key,
-        )
+        if use_grpc and grpc_port is None:
+            grpc_port = 6334
+        # Сохраняем параметры подключения: они нужны для ленивого создания
+        # AsyncQdrantClient в конкурентном upsert'е.
+        # timeout и keepalive держат каналы теплыми между вызовами,
+        # чтобы долгоживущий клиент не переоткрывал соединения.
+        self._conn_params = dict(host=host, port=port, grpc_port=grpc_port, api_key=api_key,
+                                 prefer_grpc=use_grpc, timeout=30,
+                                 grpc_options={"grpc.keepalive_time_ms": 10000})
+        try:
+            self.client = QdrantNativeClient(**self._conn_params) # Используем переименованный импорт
+            if use_grpc:
+                # Конструктор клиента соединение не открывает, поэтому закрытый
+                # gRPC-порт здесь сам по себе не всплывет: пробуем канал дешевым
+                # запросом, чтобы откат на HTTP сработал сразу, а не на первом upsert.
+                self.client.get_collections()
+        except Exception as e:
+            if not use_grpc:
+                raise
+            # gRPC-порт может быть закрыт (прокси, старый деплой) — откатываемся на HTTP.
+            logger.warning(f"Не удалось подключиться к Qdrant по gRPC, откат на HTTP: {e}")
+            self._conn_params['prefer_grpc'] = False
+            self.client = QdrantNativeClient(**self._conn_params)
         self.collection_name = collection_name
         self.vector_size = vector_size # Теперь vector_size передается явно
 
@@ -38,12 +151,56 @@ class QdrantClient: # Переименован класс в QdrantClient
         logger.info(f"Initialized Qdrant client for {host}:{port}. Collection: '{self.collection_name}'. Expected vector size: {self.vector_size if self.vector_size else 'Not set'}")
 
 
-    def recreate_collection(self, vector_size: Optional[int] = None, distance: models.Distance = models.Distance.COSINE):
+    def ensure_collection(self, vector_size: Optional[int] = None, distance: models.Distance = models.Distance.COSINE):
+        """
+        Создает коллекцию только если её ещё нет; существующую не трогает и не проверяет.
+        Дешёвый путь для регулярного ингеста: один collection_exists вместо
+        get_collection + возможного delete/re-create.
+        :param vector_size: Размерность векторов. Если None, используется self.vector_size.
+        :param distance: Метрика расстояния для векторов.
+        """
+        if vector_size is None and self.vector_size is None:
+            raise ValueError("Vector size must be provided either during QdrantClient initialization or in ensure_collection method call.")
+
+        if vector_size is not None:
+            self.vector_size = vector_size
+
+        if self.client.collection_exists(collection_name=self.collection_name):
+            logger.info(f"Collection '{self.collection_name}' already exists. Skipping creation.")
+            return
+
+        logger.info(f"Creating collection '{self.collection_name}' with vector size {self.vector_size} and distance {distance.value}...")
+        self.client.create_collection(
+            collection_name=self.collection_name,
+            vectors_config=models.VectorParams(size=self.vector_size, distance=distance),
+            optimizers_config=models.OptimizersConfigDiff(memmap_threshold=20000)
+        )
+        # Свежая коллекция сразу получает payload-индексы: обычный ingest
+        # идет именно через ensure_collection, а не recreate_collection.
+        self.create_payload_indexes()
+        logger.info(f"Collection '{self.collection_name}' created successfully.")
+
+    def recreate_collection(self, vector_size: Optional[int] = None, distance: models.Distance = models.Distance.COSINE,
+                            quantization: bool = True, on_disk: bool = False,
+                            hnsw_config: Optional[Dict[str, Any]] = None):
         """
         Пересоздает (или создает, если нет) коллекцию с заданными параметрами.
         Если vector_size не передан, используется self.vector_size.
         :param vector_size: Размерность векторов. Если None, используется self.vector_size.
         :param distance: Метрика расстояния для векторов.
+        :param quantization: Включить скалярную INT8-квантизацию: сжатая
+                             копия векторов (~4x меньше RAM) живет в памяти
+                             и ускоряет обход HNSW, оригиналы остаются для
+                             точного rescore. Потеря recall при quantile=0.99
+                             пренебрежима.
+        :param on_disk: Режим для коллекций, не помещающихся в RAM: оригиналы
+                        векторов, HNSW-граф и payload уходят в mmap на диск,
+                        резидентные страницы выбирает ядро. В паре с
+                        quantization=True в памяти остается только INT8-копия
+                        для быстрого обхода графа.
+        :param hnsw_config: Переопределение параметров HNSW (m, ef_construct,
+                            full_scan_threshold); по умолчанию
+                            _DEFAULT_HNSW_CONFIG.
         """
         if vector_size is None and self.vector_size is None:
             raise ValueError("Vector size must be provided either during QdrantClient initialization or in recreate_collection method call.")
@@ -52,14 +209,28 @@ class QdrantClient: # Переименован класс в QdrantClient
         if vector_size is not None:
             self.vector_size = vector_size
         
-        # Проверяем существование коллекции и её конфигурацию
-        collection_exists = self.client.collection_exists(collection_name=self.collection_name)
-        
-        if collection_exists:
+        # Проверяем существование коллекции и её конфигурацию одним
+        # get_collection: отдельный collection_exists стоил бы лишний
+        # round-trip на каждом старте сервиса. Отсутствие коллекции приходит
+        # по-разному в зависимости от транспорта: 404 на REST, статус
+        # NOT_FOUND на gRPC (транспорт по умолчанию), ValueError у
+        # локального клиента. Остальные ошибки пробрасываем.
+        collection_info = None
+        try:
+            collection_info = self.client.get_collection(collection_name=self.collection_name)
+        except UnexpectedResponse as e:
+            if e.status_code != 404:
+                raise
+        except grpc.RpcError as e:
+            if e.code() != grpc.StatusCode.NOT_FOUND:
+                raise
+        except ValueError:
+            pass  # локальный клиент: "Collection ... not found"
+
+        if collection_info is not None:
             try:
-                collection_info = self.client.get_collection(collection_name=self.collection_name)
                 current_vectors_config = collection_info.config.vectors
-                
+
                 # Check if dimensions and distance match
                 if (current_vectors_config.size == self.vector_size and
                         current_vectors_config.distance == distance):
@@ -73,17 +244,117 @@ class QdrantClient: # Переименован класс в QdrantClient
                 self.client.delete_collection(collection_name=self.collection_name)
         
         logger.info(f"Creating collection '{self.collection_name}' with vector size {self.vector_size} and distance {distance.value}...")
+        quantization_config = None
+        if quantization:
+            quantization_config = models.ScalarQuantization(
+                scalar=models.ScalarQuantizationConfig(
+                    type=models.ScalarType.INT8,
+                    quantile=0.99,
+                    always_ram=True,
+                )
+            )
+        # indexing_threshold=0: свежесозданная коллекция сразу готова к
+        # массовой загрузке без перестройки HNSW после каждого батча.
+        # После ингеста обязателен finalize_bulk_load(), иначе поиск
+        # останется на полном переборе.
+        hnsw_params = dict(self._DEFAULT_HNSW_CONFIG if hnsw_config is None else hnsw_config)
+        if on_disk:
+            hnsw_params['on_disk'] = True
         self.client.recreate_collection(
             collection_name=self.collection_name,
-            vectors_config=models.VectorParams(size=self.vector_size, distance=distance),
-            optimizers_config=models.OptimizersConfigDiff(memmap_threshold=20000) # Пример оптимизации
+            vectors_config=models.VectorParams(size=self.vector_size, distance=distance, on_disk=on_disk),
+            hnsw_config=models.HnswConfigDiff(**hnsw_params),
+            on_disk_payload=on_disk,
+            optimizers_config=models.OptimizersConfigDiff(memmap_threshold=20000, indexing_threshold=0),
+            quantization_config=quantization_config
         )
-        logger.info(f"Collection '{self.collection_name}' created successfully.")
+        logger.info(f"Collection '{self.collection_name}' created successfully (indexing deferred until finalize_bulk_load).")
+        self.create_payload_indexes()
 
-    def upsert_points(self, points: List[Dict[str, Any]]):
+    def create_payload_indexes(self, integer_fields: Optional[List[str]] = None,
+                               keyword_fields: Optional[List[str]] = None):
+        """
+        Создает инвертированные индексы по полям payload: фильтр по
+        проиндексированному полю идет по индексу вместо сканирования
+        каждой точки-кандидата под фильтром. По умолчанию индексируются
+        поля, которыми пользуется retriever (сектор, регион, статусы).
+        """
+        if integer_fields is None:
+            integer_fields = list(self._INTEGER_INDEX_FIELDS)
+        if keyword_fields is None:
+            keyword_fields = list(self._KEYWORD_INDEX_FIELDS)
+
+        schemas = [(field, models.PayloadSchemaType.INTEGER) for field in integer_fields]
+        schemas += [(field, models.PayloadSchemaType.KEYWORD) for field in keyword_fields]
+        for field_name, field_schema in schemas:
+            self.client.create_payload_index(
+                collection_name=self.collection_name,
+                field_name=field_name,
+                field_schema=field_schema,
+            )
+        logger.info(f"Созданы payload-индексы коллекции '{self.collection_name}': {integer_fields + keyword_fields}.")
+
+    def suspend_indexing(self):
+        """
+        Отключает построение HNSW-индекса на время массовой загрузки
+        (indexing_threshold=0): сервер не тратит CPU и I/O на перестройку
+        индекса после каждого батча. Обязательно вызвать resume_indexing
+        после загрузки (try/finally на стороне вызывающего).
+        """
+        self.client.update_collection(
+            collection_name=self.collection_name,
+            optimizer_config=models.OptimizersConfigDiff(indexing_threshold=0)
+        )
+        logger.info(f"Индексация коллекции '{self.collection_name}' приостановлена на время загрузки.")
+
+    def resume_indexing(self, indexing_threshold: int = 20000):
+        """
+        Возвращает порог индексации после массовой загрузки — сервер строит
+        индекс один раз по всем свежим точкам.
+        """
+        self.client.update_collection(
+            collection_name=self.collection_name,
+            optimizer_config=models.OptimizersConfigDiff(indexing_threshold=indexing_threshold)
+        )
+        logger.info(f"Индексация коллекции '{self.collection_name}' возобновлена (порог: {indexing_threshold}).")
+
+    def finalize_bulk_load(self, indexing_threshold: int = 20000):
+        """
+        Завершает массовую загрузку: включает построение HNSW-индекса
+        (см. resume_indexing). Вызывать после последнего батча upsert,
+        если коллекция создавалась через recreate_collection — она
+        создается с отложенной индексацией.
+        """
+        self.resume_indexing(indexing_threshold=indexing_threshold)
+
+    def _validate_vectors(self, points: List[Dict[str, Any]]):
+        """
+        Проверяет размерность всех векторов одной операцией NumPy вместо
+        Python-цикла по точкам: O(N) итераций уходит в C-код. Рваные векторы
+        (разной длины) не собираются в матрицу (N, D) и тоже отлавливаются.
+        """
+        try:
+            arr = np.asarray([point['vector'] for point in points], dtype=np.float32)
+        except ValueError as e:
+            raise ValueError(f"Vectors have inconsistent dimensions: {e}")
+        if arr.ndim != 2 or arr.shape[1] != self.vector_size:
+            raise ValueError(f"Vectors must form a matrix of shape (N, {self.vector_size}), got {arr.shape}.")
+
+    @_retry_on_unexpected_response
+    def upsert_points(self, points: List[Dict[str, Any]], batch_size: int = 256, wait: bool = False):
         """
         Вставляет или обновляет точки (векторы + payload) в коллекцию.
+        Загрузка идет батчами по batch_size точек: один гигантский upsert
+        упирается в серверные таймауты и память, а слишком мелкие батчи
+        платят RTT за каждую горстку точек.
+        При массовой загрузке в свежую коллекцию после последнего батча
+        вызовите finalize_bulk_load(), чтобы сервер построил индекс.
         :param points: Список словарей, каждый из которых содержит 'id', 'vector' и 'payload'.
+        :param batch_size: Количество точек в одном запросе upsert.
+        :param wait: Ждать ли fsync WAL и обновления индекса на каждый батч.
+                     По умолчанию False — сервер отвечает ACKNOWLEDGED и
+                     конвейеризует записи; передавайте True, когда нужна
+                     семантика read-your-write сразу после вызова.
         """
         if not points:
             logger.warning("No points provided for upsert.")
@@ -93,29 +364,37 @@ class QdrantClient: # Переименован класс в QdrantClient
             raise RuntimeError("Cannot upsert points: vector_size is not set. Call recreate_collection first.")
 
         # Проверяем, что все векторы имеют правильную размерность
-        for i, point in enumerate(points):
-            if len(point['vector']) != self.vector_size:
-                raise ValueError(f"Vector at index {i} has dimension {len(point['vector'])}, expected {self.vector_size}.")
+        self._validate_vectors(points)
 
         try:
-            qdrant_points = [
-                models.PointStruct(
-                    id=str(point['id']),
-                    vector=point['vector'],
-                    payload=point['payload']
+            total = 0
+            for start in range(0, len(points), batch_size):
+                batch = points[start:start + batch_size]
+                # models.Batch — три плоских списка вместо pydantic-модели
+                # PointStruct на каждую точку: одна аллокация на батч и
+                # заметно меньше давления на GC в горячем цикле ингеста.
+                qdrant_points = models.Batch(
+                    ids=[point['id'] for point in batch],
+                    vectors=[point['vector'] for point in batch],
+                    payloads=[point['payload'] for point in batch],
                 )
-                for point in points
-            ]
-            
-            operation_info = self.client.upsert(
-                collection_name=self.collection_name,
-                wait=True,
-                points=qdrant_points
-            )
-            if operation_info.status == models.UpdateStatus.COMPLETED:
-                logger.info(f"Операция upsert завершена успешно: {len(points)} точек.")
-            else:
-                logger.error(f"Операция upsert завершена со статусом: {operation_info.status}. Ошибка: {operation_info.error}")
+
+                operation_info = self.client.upsert(
+                    collection_name=self.collection_name,
+                    wait=wait,
+                    points=qdrant_points
+                )
+                if not wait:
+                    # Без ожидания сервер отвечает ACKNOWLEDGED — батч принят
+                    # в очередь, durability доедет фоном.
+                    total += len(batch)
+                    logger.debug(f"Upsert батча принят сервером: {len(batch)} точек ({total}/{len(points)}).")
+                elif operation_info.status == models.UpdateStatus.COMPLETED:
+                    total += len(batch)
+                    logger.debug(f"Upsert батча завершен: {len(batch)} точек ({total}/{len(points)}).")
+                else:
+                    logger.error(f"Операция upsert завершена со статусом: {operation_info.status}. Ошибка: {operation_info.error}")
+            logger.info(f"Операция upsert завершена успешно: {total} точек.")
 
         except UnexpectedResponse as e:
             logger.error(f"Ошибка при upsert в Qdrant (UnexpectedResponse): {e}")
@@ -124,12 +403,111 @@ class QdrantClient: # Переименован класс в QdrantClient
             logger.error(f"Неизвестная ошибка при upsert: {e}")
             raise
 
+    def bulk_upload(self, points: List[Dict[str, Any]], batch_size: int = 256, parallel: int = 4):
+        """
+        Массовая загрузка через upload_collection: клиент сам режет данные на
+        батчи и раскидывает сериализацию и отправку по parallel процессам,
+        не дожидаясь подтверждения каждого батча (wait=False у клиента по
+        умолчанию). Для небольших или онлайновых записей используйте
+        upsert_points; после массовой загрузки в свежую коллекцию вызовите
+        finalize_bulk_load().
+        :param points: Список словарей с 'id', 'vector' и 'payload'.
+        :param batch_size: Размер батча внутри upload_collection.
+        :param parallel: Число процессов-отправителей.
+        """
+        if not points:
+            logger.warning("No points provided for upsert.")
+            return
+
+        if self.vector_size is None:
+            raise RuntimeError("Cannot upsert points: vector_size is not set. Call recreate_collection first.")
+
+        self._validate_vectors(points)
+
+        # Три параллельных списка вместо PointStruct на каждую точку —
+        # upload_collection принимает их напрямую.
+        ids = [point['id'] for point in points]
+        vectors = [point['vector'] for point in points]
+        payloads = [point['payload'] for point in points]
+
+        try:
+            self.client.upload_collection(
+                collection_name=self.collection_name,
+                vectors=vectors,
+                payload=payloads,
+                ids=ids,
+                batch_size=batch_size,
+                parallel=parallel,
+            )
+            logger.info(f"Массовая загрузка завершена: {len(points)} точек ({parallel} воркеров).")
+        except Exception as e:
+            logger.error(f"Ошибка при массовой загрузке в Qdrant: {e}")
+            raise
+
+    def upsert_points_concurrent(self, points: List[Dict[str, Any]], batch_size: int = 256,
+                                 n_concurrent: int = 4, wait: bool = False):
+        """
+        Синхронная обертка над upsert_points_async для вызова из обычного
+        кода (пайплайны, CLI). Параметры батчей те же, что у upsert_points.
+        """
+        asyncio.run(self.upsert_points_async(points, batch_size=batch_size,
+                                             n_concurrent=n_concurrent, wait=wait))
+
+    async def upsert_points_async(self, points: List[Dict[str, Any]], batch_size: int = 256,
+                                  n_concurrent: int = 4, wait: bool = False):
+        """
+        Конкурентная версия upsert_points: батчи уходят через AsyncQdrantClient
+        с ограничением на число запросов в полете (semaphore). Сетевая
+        латентность батчей перекрывается, что особенно заметно на удаленном
+        Qdrant. Из async-кода зовите этот метод напрямую, из синхронного —
+        upsert_points_concurrent.
+        """
+        if not points:
+            logger.warning("No points provided for upsert.")
+            return
+
+        if self.vector_size is None:
+            raise RuntimeError("Cannot upsert points: vector_size is not set. Call recreate_collection first.")
+
+        self._validate_vectors(points)
+
+        batches = [points[start:start + batch_size] for start in range(0, len(points), batch_size)]
+        await self._upsert_batches_async(batches, n_concurrent, wait=wait)
+        logger.info(f"Конкурентный upsert завершен успешно: {len(points)} точек ({len(batches)} батчей).")
+
+    async def _upsert_batches_async(self, batches: List[List[Dict[str, Any]]], n_concurrent: int,
+                                    wait: bool = False):
+        aclient = AsyncQdrantClient(**self._conn_params)
+        semaphore = asyncio.Semaphore(n_concurrent)
+
+        async def _upsert_one(batch):
+            # Batch-формат и здесь: без PointStruct на точку.
+            qdrant_points = models.Batch(
+                ids=[point['id'] for point in batch],
+                vectors=[point['vector'] for point in batch],
+                payloads=[point['payload'] for point in batch],
+            )
+            async with semaphore:
+                await aclient.upsert(
+                    collection_name=self.collection_name,
+                    wait=wait,
+                    points=qdrant_points
+                )
+
+        try:
+            await asyncio.gather(*(_upsert_one(batch) for batch in batches))
+        finally:
+            await aclient.close()
+
+    @_retry_on_unexpected_response
     def search_points(self,
                       query_vector: List[float],
                       limit: int = 10,
                       filters: Optional[models.Filter] = None,
                       with_payload: bool = True,
-                      with_vectors: bool = False) -> List[ScoredPoint]:
+                      with_vectors: bool = False,
+                      hnsw_ef: Optional[int] = None,
+                      payload_fields: Optional[List[str]] = None) -> List[ScoredPoint]:
         """
         Выполняет поиск ближайших точек к заданному вектору.
         :param query_vector: Вектор запроса.
@@ -137,6 +515,12 @@ class QdrantClient: # Переименован класс в QdrantClient
         :param filters: Опциональные фильтры для payload (Qdrant models.Filter).
         :param with_payload: Возвращать ли payload найденных точек.
         :param with_vectors: Возвращать ли сами векторы найденных точек.
+        :param hnsw_ef: Размер beam-поиска по графу на время запроса: больше —
+                        выше recall, меньше — ниже латентность. None — серверное
+                        значение по умолчанию.
+        :param payload_fields: Вернуть только перечисленные поля payload:
+                               по сети идет ровно то, что нужно вызывающему
+                               (например, только case_id/title для re-ranking).
         :return: Список ScoredPoint объектов.
         """
         if self.vector_size is None:
@@ -151,22 +535,222 @@ class QdrantClient: # Переименован класс в QdrantClient
                 query_vector=query_vector,
                 query_filter=filters,
                 limit=limit,
-                with_payload=with_payload,
-                with_vectors=with_vectors
+                with_payload=payload_fields if payload_fields else with_payload,
+                with_vectors=with_vectors,
+                search_params=models.SearchParams(hnsw_ef=hnsw_ef) if hnsw_ef is not None else None
             )
-            return [
-                ScoredPoint(
+            # При with_payload=False не тратимся на CasePayload вовсе:
+            # вызывающему нужны только id и score (например, для re-ranking).
+            # Горячий путь сборки результатов: методы привязываются к локальным
+            # именам один раз (без поиска атрибутов на каждой итерации), список
+            # аллоцируется сразу нужного размера вместо append-роста, а модели
+            # собираются через model_construct без повторной валидации.
+            scored_construct = ScoredPoint.model_construct
+            payload_from_qdrant = CasePayload.from_qdrant
+            results: List[ScoredPoint] = [None] * len(search_result)
+            for i, point in enumerate(search_result):
+                results[i] = scored_construct(
                     id=point.id,
                     score=point.score,
-                    payload=CasePayload(**point.payload) if point.payload else None,
+                    payload=payload_from_qdrant(point.payload) if with_payload and point.payload else None,
                     vector=point.vector if with_vectors else None
                 )
-                for point in search_result
+            return results
+        except Exception as e:
+            logger.error(f"Ошибка при поиске в Qdrant: {e}")
+            raise
+
+    def search_points_eq(self, query_vector: List[float], key: str, value: Hashable,
+                         **kwargs) -> List[ScoredPoint]:
+        """
+        Быстрый путь для частого случая "поле == значение" (sector_id=10,
+        region_name='...'): готовый Filter берется из кэша вместо пересборки
+        pydantic-моделей на каждый запрос. Остальные параметры — как у
+        search_points.
+        """
+        return self.search_points(query_vector, filters=_make_eq_filter(key, value), **kwargs)
+
+    def search_points_batch(self,
+                            query_vectors: List[List[float]],
+                            limit: int = 10,
+                            filters: Optional[models.Filter] = None,
+                            with_payload: bool = True,
+                            with_vectors: bool = False) -> List[List[ScoredPoint]]:
+        """
+        Пакетный поиск: N запросов уходят одним search_batch вместо N
+        последовательных round-trip'ов. Сервер обрабатывает их без
+        параллелизма, но соединение и сериализация амортизируются на весь
+        пакет — заметно поверх gRPC.
+        :param query_vectors: Список векторов запросов.
+        :return: Список списков ScoredPoint, по позиции на каждый запрос.
+        """
+        if self.vector_size is None:
+            raise RuntimeError("Cannot search points: vector_size is not set. Call recreate_collection first.")
+
+        for i, query_vector in enumerate(query_vectors):
+            if len(query_vector) != self.vector_size:
+                raise ValueError(f"Query vector at index {i} has dimension {len(query_vector)}, expected {self.vector_size}.")
+
+        try:
+            requests = [
+                models.SearchRequest(
+                    vector=query_vector,
+                    filter=filters,
+                    limit=limit,
+                    with_payload=with_payload,
+                    with_vector=with_vectors
+                )
+                for query_vector in query_vectors
+            ]
+            batch_result = self.client.search_batch(
+                collection_name=self.collection_name,
+                requests=requests
+            )
+            return [
+                [
+                    ScoredPoint(
+                        id=point.id,
+                        score=point.score,
+                        payload=CasePayload.from_qdrant(point.payload) if point.payload else None,
+                        vector=point.vector if with_vectors else None
+                    )
+                    for point in hits
+                ]
+                for hits in batch_result
             ]
+        except Exception as e:
+            logger.error(f"Ошибка при пакетном поиске в Qdrant: {e}")
+            raise
+
+    def iter_search_points(self,
+                           query_vector: List[float],
+                           limit: int = 10,
+                           filters: Optional[models.Filter] = None,
+                           with_payload: bool = True,
+                           with_vectors: bool = False,
+                           hnsw_ef: Optional[int] = None) -> Iterator[ScoredPoint]:
+        """
+        Генераторная версия search_points: ScoredPoint отдаются по мере
+        конструирования, без материализации всего списка — меньше пиковая
+        память при больших limit и быстрее до первого результата.
+        """
+        if self.vector_size is None:
+            raise RuntimeError("Cannot search points: vector_size is not set. Call recreate_collection first.")
+
+        if len(query_vector) != self.vector_size:
+            raise ValueError(f"Query vector has dimension {len(query_vector)}, expected {self.vector_size}.")
+
+        try:
+            search_result = self.client.search(
+                collection_name=self.collection_name,
+                query_vector=query_vector,
+                query_filter=filters,
+                limit=limit,
+                with_payload=with_payload,
+                with_vectors=with_vectors,
+                search_params=models.SearchParams(hnsw_ef=hnsw_ef) if hnsw_ef is not None else None
+            )
         except Exception as e:
             logger.error(f"Ошибка при поиске в Qdrant: {e}")
             raise
 
+        for point in search_result:
+            yield ScoredPoint(
+                id=point.id,
+                score=point.score,
+                payload=CasePayload.from_qdrant(point.payload) if with_payload and point.payload else None,
+                vector=point.vector if with_vectors else None
+            )
+
+    def iter_scroll(self,
+                    filters: Optional[models.Filter] = None,
+                    batch: int = 256,
+                    with_payload: bool = True,
+                    with_vectors: bool = False) -> Iterator[ScoredPoint]:
+        """
+        Постраничная выгрузка коллекции через scroll: точки идут батчами по
+        batch со сквозным offset'ом от сервера — без limit в миллион и без
+        материализации всей коллекции в памяти клиента.
+        :param filters: Опциональный фильтр отбираемых точек.
+        :param batch: Размер страницы scroll.
+        """
+        next_offset = None
+        while True:
+            try:
+                records, next_offset = self.client.scroll(
+                    collection_name=self.collection_name,
+                    scroll_filter=filters,
+                    limit=batch,
+                    offset=next_offset,
+                    with_payload=with_payload,
+                    with_vectors=with_vectors,
+                )
+            except Exception as e:
+                logger.error(f"Ошибка при scroll-выгрузке из Qdrant: {e}")
+                raise
+
+            for record in records:
+                yield ScoredPoint(
+                    id=record.id,
+                    score=0.0,  # scroll не считает близость — скора нет
+                    payload=CasePayload.from_qdrant(record.payload) if with_payload and record.payload else None,
+                    vector=record.vector if with_vectors else None,
+                )
+            if next_offset is None:
+                break
+
+    async def search_many_async(self,
+                                query_vectors: List[List[float]],
+                                limit: int = 10,
+                                filters: Optional[models.Filter] = None,
+                                with_payload: bool = True,
+                                with_vectors: bool = False) -> List[List[ScoredPoint]]:
+        """
+        По-настоящему конкурентный многозапросный поиск: search_batch
+        обрабатывается сервером последовательно, а N параллельных search
+        через AsyncQdrantClient перекрывают сетевые латентности друг друга.
+        :param query_vectors: Список векторов запросов.
+        :return: Список списков ScoredPoint, по позиции на каждый запрос.
+        """
+        if self.vector_size is None:
+            raise RuntimeError("Cannot search points: vector_size is not set. Call recreate_collection first.")
+
+        for i, query_vector in enumerate(query_vectors):
+            if len(query_vector) != self.vector_size:
+                raise ValueError(f"Query vector at index {i} has dimension {len(query_vector)}, expected {self.vector_size}.")
+
+        aclient = AsyncQdrantClient(**self._conn_params)
+        try:
+            batch_result = await asyncio.gather(*(
+                aclient.search(
+                    collection_name=self.collection_name,
+                    query_vector=query_vector,
+                    query_filter=filters,
+                    limit=limit,
+                    with_payload=with_payload,
+                    with_vectors=with_vectors
+                )
+                for query_vector in query_vectors
+            ))
+        except Exception as e:
+            logger.error(f"Ошибка при конкурентном поиске в Qdrant: {e}")
+            raise
+        finally:
+            await aclient.close()
+
+        return [
+            [
+                ScoredPoint(
+                    id=point.id,
+                    score=point.score,
+                    payload=CasePayload.from_qdrant(point.payload) if point.payload else None,
+                    vector=point.vector if with_vectors else None
+                )
+                for point in hits
+            ]
+            for hits in batch_result
+        ]
+
     def count_points(self, filters: Optional[models.Filter] = None) -> int:
         """
         Подсчитывает количество точек в коллекции с учетом фильтров.
@@ -219,7 +803,10 @@ if __name__ == "__main__":
                     sector_name="Производство",
                     text_chunk="LLM для оптимизации смен.",
                     text_chunk_original_field="summary"
-                ).model_dump() # .dict() для v1, .model_dump() для v2
+                ).model_dump(exclude_none=True, exclude_defaults=True)
+                # exclude_none/exclude_defaults срезают незаполненные Optional-поля
+                # из payload — меньше байт на проводе и в хранилище; читатели
+                # (CasePayload.from_qdrant, extra='ignore') к отсутствию ключей терпимы.
             },
             {
                 "id": 2,
@@ -235,7 +822,7 @@ if __name__ == "__main__":
                     sector_name="Финансы",
                     text_chunk="RAG на базе документов ЦБ.",
                     text_chunk_original_field="summary"
-                ).model_dump()
+                ).model_dump(exclude_none=True, exclude_defaults=True)
             },
             {
                 "id": 3,
@@ -251,7 +838,7 @@ if __name__ == "__main__":
                     sector_name="Производство",
                     text_chunk="Оптимизация маршрутов с AI.",
                     text_chunk_original_field="summary"
-                ).model_dump()
+                ).model_dump(exclude_none=True, exclude_defaults=True)
             },
         ]
 
@@ -1,5 +1,5 @@
 # vector_store/schemas.py
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Union
 from datetime import datetime
 from pydantic import BaseModel, Field
 
@@ -9,6 +9,11 @@ from pydantic import BaseModel, Field
 # -----------------------------------------------------------
 
 class CasePayload(BaseModel):
+    # Результаты поиска порождают тысячи таких объектов. Дешевизна инстанса
+    # обеспечена дефолтами pydantic v2 (extra='ignore',
+    # validate_assignment=False) плюс model_construct в from_qdrant —
+    # явный конфиг тут не нужен. Вариант со slots (pydantic-dataclass)
+    # сломал бы model_dump/model_construct у вызывающих.
     case_id: int
     title: str
     summary: str
@@ -40,13 +45,25 @@ class CasePayload(BaseModel):
     # Например, комбинированный текст для отображения всего кейса при релевантности чанка
     full_case_text: Optional[str] = None
 
+    @classmethod
+    def from_qdrant(cls, payload: Dict[str, Any]) -> "CasePayload":
+        """
+        Собирает CasePayload из payload, прочитанного из Qdrant, через
+        model_construct — без повторной валидации: эти данные писали мы
+        сами и они уже проходили проверку на пути в коллекцию. Экономит
+        полный цикл pydantic-валидации на каждый результат поиска.
+        """
+        return cls.model_construct(**payload)
+
 
 # -----------------------------------------------------------
 # Модель для результата поиска из Qdrant
 # -----------------------------------------------------------
 
 class ScoredPoint(BaseModel):
-    id: str # В Qdrant ID может быть Integer или UUID, здесь пока String для гибкости
+    # Как и CasePayload: дефолты pydantic v2 уже облегченные, собирается
+    # через model_construct на горячем пути search_points.
+    id: Union[int, str] # В Qdrant ID — Integer или UUID; отдаем как есть, без str()-коэрции
     score: float
     payload: Optional[CasePayload] = None # Payload (метаданные)
     vector: Optional[List[float]] = None # Сам вектор, по умолчанию не возвращаем